@@ -0,0 +1,306 @@
+import pygame
+import os
+import time
+import random
+import struct
+import threading
+from array import array
+import telemetry
+from collision import merge_platform_spans
+
+ARENA_MAGIC = b'ARNA'
+# 2: ярусы разнесены на рост бойца плюс толщину платформы
+ARENA_VERSION = 2
+# magic, версия, seed, ширина, высота, размер ячейки, число платформ,
+# отрезков земли, точек появления, ячеек индекса и ссылок в индексе
+HEADER_FORMAT = '<4sIqiiiIIIII'
+
+CHUNK_WIDTH = 400
+GROUND_HEIGHT = 50
+PLATFORM_HEIGHT = 25
+TIER_COUNT = 3
+
+class Arena:
+    """Готовая арена: платформы, слитые отрезки земли, точки появления и сеточный индекс"""
+
+    def __init__(self, seed, width, height, platforms, spans, spawn_points,
+                 cell_size=256, cells=None):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.platforms = [pygame.Rect(p) for p in platforms]
+        # Отрезки (left, right, top) - соседние платформы одного уровня слиты в один
+        self.spans = list(spans)
+        self.spawn_points = list(spawn_points)
+        self.cells = cells if cells is not None else self.build_index()
+        self.neighbourhoods = self.build_neighbourhoods()
+
+    def build_index(self):
+        """Сетка ячеек cell_size x cell_size -> индексы платформ в ней"""
+        cells = {}
+        size = self.cell_size
+        for index, platform in enumerate(self.platforms):
+            for cell_x in range(platform.left // size, (platform.right - 1) // size + 1):
+                for cell_y in range(platform.top // size, (platform.bottom - 1) // size + 1):
+                    cells.setdefault((cell_x, cell_y), []).append(index)
+        return cells
+
+    def build_neighbourhoods(self):
+        """Ячейка -> кортеж платформ из нее и восьми соседних (для nearby)"""
+        size = self.cell_size
+        neighbourhoods = {}
+        for cell_x in range(-1, self.width // size + 2):
+            for cell_y in range(-1, self.height // size + 2):
+                indices = sorted({index
+                                  for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                                  for index in self.cells.get((cell_x + dx, cell_y + dy), ())})
+                neighbourhoods[(cell_x, cell_y)] = tuple(self.platforms[i] for i in indices)
+        return neighbourhoods
+
+    def nearby(self, rect):
+        """Платформы вокруг rect для тика симуляции - готовый кортеж, без выделений.
+
+        Берутся 3x3 ячейки вокруг центра rect: для rect не больше ячейки
+        запас с каждой стороны - не меньше половины ячейки.
+        """
+        size = self.cell_size
+        return self.neighbourhoods.get((rect.centerx // size, rect.centery // size), ())
+
+    def query(self, rect, margin=0):
+        """Платформы рядом с rect (с запасом margin) без перебора всей арены"""
+        size = self.cell_size
+        found = []
+        seen = set()
+        for cell_x in range((rect.left - margin) // size, (rect.right + margin) // size + 1):
+            for cell_y in range((rect.top - margin) // size, (rect.bottom + margin) // size + 1):
+                for index in self.cells.get((cell_x, cell_y), ()):
+                    if index not in seen:
+                        seen.add(index)
+                        found.append(self.platforms[index])
+        return found
+
+    def save(self, path):
+        """Сохраняет арену в компактный двоичный формат"""
+        cell_items = sorted(self.cells.items())
+        cell_table = array('i')
+        references = array('i')
+        for (cell_x, cell_y), indices in cell_items:
+            cell_table.extend((cell_x, cell_y, len(references), len(indices)))
+            references.extend(indices)
+
+        platforms = array('i', [value for p in self.platforms for value in (p.x, p.y, p.width, p.height)])
+        spans = array('i', [value for span in self.spans for value in span])
+        spawns = array('i', [value for point in self.spawn_points for value in point])
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, ARENA_MAGIC, ARENA_VERSION, self.seed,
+                                self.width, self.height, self.cell_size,
+                                len(self.platforms), len(self.spans), len(self.spawn_points),
+                                len(cell_items), len(references)))
+            for data in (platforms, spans, spawns, cell_table, references):
+                data.tofile(f)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            header = f.read(struct.calcsize(HEADER_FORMAT))
+            (magic, version, seed, width, height, cell_size, platform_count,
+             span_count, spawn_count, cell_count, reference_count) = struct.unpack(HEADER_FORMAT, header)
+            if magic != ARENA_MAGIC or version != ARENA_VERSION:
+                raise ValueError(f"неизвестный формат арены: {path}")
+
+            def read_ints(count):
+                data = array('i')
+                data.fromfile(f, count)
+                return data
+
+            platforms = read_ints(platform_count * 4)
+            spans = read_ints(span_count * 3)
+            spawns = read_ints(spawn_count * 2)
+            cell_table = read_ints(cell_count * 4)
+            references = read_ints(reference_count)
+
+        cells = {}
+        for i in range(0, len(cell_table), 4):
+            cell_x, cell_y, start, count = cell_table[i:i + 4]
+            cells[(cell_x, cell_y)] = list(references[start:start + count])
+
+        return cls(seed, width, height,
+                   [tuple(platforms[i:i + 4]) for i in range(0, len(platforms), 4)],
+                   [tuple(spans[i:i + 3]) for i in range(0, len(spans), 3)],
+                   [tuple(spawns[i:i + 2]) for i in range(0, len(spawns), 2)],
+                   cell_size, cells)
+
+class ArenaGenerator:
+    """Воспроизводимый по seed генератор арен, строит арену по кускам"""
+
+    def __init__(self, seed, width, height, spawn_count=2, player_size=(80, 120)):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.spawn_count = spawn_count
+        self.player_size = player_size
+        # Шаг между ярусами: боец ростом player_size[1] стоит под платформой,
+        # не задевая ее нижний край головой
+        self.tier_height = player_size[1] + PLATFORM_HEIGHT
+        # Над верхним ярусом тоже должен помещаться боец
+        self.tier_count = max(1, min(TIER_COUNT, (height - GROUND_HEIGHT - player_size[1])
+                                     // self.tier_height))
+
+    def generate_steps(self):
+        """Генератор: один кусок арены за шаг, в конце возвращает Arena через StopIteration"""
+        rng = random.Random(self.seed)
+        ground_top = self.height - GROUND_HEIGHT
+        platforms = []
+
+        for chunk_left in range(0, self.width, CHUNK_WIDTH):
+            chunk_right = min(self.width, chunk_left + CHUNK_WIDTH)
+
+            # Земля плитками; изредка провал, кроме первого и последнего куска
+            x = chunk_left
+            while x < chunk_right:
+                tile_width = min(chunk_right - x, rng.randint(100, 200))
+                edge_chunk = chunk_left == 0 or chunk_right == self.width
+                if edge_chunk or rng.random() > 0.1:
+                    platforms.append((x, ground_top, tile_width, GROUND_HEIGHT))
+                x += tile_width
+
+            # Висячие платформы по ярусам над землей
+            for _ in range(rng.randint(1, 3)):
+                tier = rng.randint(1, self.tier_count)
+                platform_width = rng.randint(100, 220)
+                platform_x = rng.randint(chunk_left, max(chunk_left, chunk_right - platform_width))
+                platform_y = ground_top - tier * self.tier_height
+                platforms.append((platform_x, platform_y, platform_width, PLATFORM_HEIGHT))
+
+            yield chunk_right / self.width
+
+        platform_rects = [pygame.Rect(p) for p in platforms]
+        spans = merge_platform_spans(platform_rects)
+        spawn_points = self.pick_spawn_points(spans, platform_rects, ground_top)
+        return Arena(self.seed, self.width, self.height, platforms, spans, spawn_points)
+
+    def generate(self):
+        steps = self.generate_steps()
+        while True:
+            try:
+                next(steps)
+            except StopIteration as done:
+                return done.value
+
+    def pick_spawn_points(self, spans, platform_rects, ground_top):
+        """Точки появления равномерно по самым широким отрезкам земли"""
+        player_width, player_height = self.player_size
+        ground = sorted((span for span in spans if span[2] == ground_top),
+                        key=lambda span: span[1] - span[0], reverse=True)
+        ground = sorted(ground[:self.spawn_count], key=lambda span: span[0])
+
+        # Если отрезков меньше, чем игроков, делим отрезки на равные доли
+        repeats = -(-self.spawn_count // len(ground))
+        points = []
+        for i in range(self.spawn_count):
+            left, right, top = ground[i % len(ground)]
+            slot = i // len(ground)
+            x = left + (right - left) * (slot + 1) // (repeats + 1) - player_width // 2
+            x = self.find_free_x(platform_rects, left, right, top, x)
+            points.append((x, top - player_height))
+        return points
+
+    def find_free_x(self, platform_rects, left, right, top, preferred_x):
+        """Ближайший к preferred_x x на отрезке, где боец не пересекает ни одну платформу"""
+        player_width, player_height = self.player_size
+        rect = pygame.Rect(0, top - player_height, player_width, player_height)
+        candidates = range(left, max(left, right - player_width) + 1)
+        for x in sorted(candidates, key=lambda x: abs(x - preferred_x)):
+            rect.x = x
+            if rect.collidelist(platform_rects) == -1:
+                return x
+        raise ValueError(f"арена {self.seed}: нет места для точки появления на {left}..{right}")
+
+def get_cache_path(cache_dir, seed, width, height):
+    return os.path.join(cache_dir, 'arenas', f"{seed}_{width}x{height}_v{ARENA_VERSION}.arena")
+
+def load_or_generate(seed, width, height, cache_dir, match_log):
+    """Берет арену из кэша на диске или генерирует и сохраняет ее.
+    
+    Ошибки кэша не фатальны - они уходят в журнал матча match_log.
+    """
+    path = get_cache_path(cache_dir, seed, width, height)
+    if os.path.exists(path):
+        try:
+            return Arena.load(path)
+        except Exception as e:
+            match_log.record(telemetry.ERROR, f"arena:load:{path}", str(e))
+
+    arena = ArenaGenerator(seed, width, height).generate()
+    try:
+        arena.save(path)
+    except Exception as e:
+        match_log.record(telemetry.ERROR, f"arena:save:{path}", str(e))
+    return arena
+
+class ArenaPrefetcher:
+    """Заранее строит арену в фоновом потоке, уступая игровому потоку между кусками.
+
+    Ошибки кэша, как и в load_or_generate, не фатальны. Журнал матча рассчитан
+    на одного писателя, поэтому поток их только копит, а пишет result.
+    """
+
+    def __init__(self, seed, width, height, cache_dir):
+        self.seed = seed
+        self.width = width
+        self.height = height
+        self.cache_dir = cache_dir
+        self.progress = 0.0
+        self.arena = None
+        self.error = None
+        # (источник, сообщение) для журнала матча
+        self.cache_errors = []
+        self.thread = threading.Thread(target=self.run, name='arena', daemon=True)
+        self.thread.start()
+
+    def run(self):
+        try:
+            path = get_cache_path(self.cache_dir, self.seed, self.width, self.height)
+            if os.path.exists(path):
+                try:
+                    self.arena = Arena.load(path)
+                    self.progress = 1.0
+                    return
+                except Exception as e:
+                    self.cache_errors.append((f"arena:load:{path}", str(e)))
+
+            steps = ArenaGenerator(self.seed, self.width, self.height).generate_steps()
+            while True:
+                try:
+                    self.progress = next(steps)
+                except StopIteration as done:
+                    arena = done.value
+                    break
+                # Отдаем GIL игровому потоку между кусками
+                time.sleep(0)
+
+            try:
+                arena.save(path)
+            except Exception as e:
+                self.cache_errors.append((f"arena:save:{path}", str(e)))
+            self.arena = arena
+        except Exception as e:
+            self.error = e
+
+    def ready(self):
+        return self.arena is not None
+
+    def result(self, match_log):
+        """Ждет окончания, пишет ошибки кэша в match_log и возвращает арену"""
+        self.thread.join()
+        for source, message in self.cache_errors:
+            match_log.record(telemetry.ERROR, source, message)
+        self.cache_errors.clear()
+        if self.error:
+            raise self.error
+        return self.arena
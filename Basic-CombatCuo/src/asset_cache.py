@@ -0,0 +1,102 @@
+import pygame
+import os
+import hashlib
+import telemetry
+from telemetry import Telemetry
+
+class AssetCache:
+    """Кэш сконвертированных и отмасштабированных изображений (память + диск)"""
+
+    def __init__(self, assets_path, cache_dir=None, match_log=None):
+        self.assets_path = assets_path
+        self.cache_dir = cache_dir or os.path.join(assets_path, '.cache')
+        # Ошибки кэша не фатальны - они идут в журнал матча
+        self.match_log = match_log or Telemetry(None)
+        self.memory = {}
+        # Хэши содержимого исходников: (путь, размер, mtime) -> sha1
+        self.source_hashes = {}
+
+    def load_image(self, path, size, alpha=True, remember=True):
+        """Возвращает изображение path, приведенное к размеру size.
+
+        remember=False - не держать результат в памяти (им владеет вызывающий,
+        например TextureManager), повторная загрузка пойдет с диска.
+        """
+        size = (int(size[0]), int(size[1]))
+        key = (path, size, alpha)
+        image = self.memory.get(key)
+        if image is not None:
+            return image
+
+        disk_path = self.get_disk_path(path, size, alpha)
+        image = self.load_from_disk(disk_path, size, alpha)
+
+        if image is None:
+            image = pygame.image.load(path)
+            image = image.convert_alpha() if alpha else image.convert()
+            if image.get_size() != size:
+                image = pygame.transform.scale(image, size)
+            self.save_to_disk(disk_path, image, alpha)
+
+        if remember:
+            self.memory[key] = image
+        return image
+
+    def load_generated(self, name, params, size, builder, alpha=False):
+        """Возвращает процедурное изображение, строя его через builder() только при промахе кэша"""
+        size = (int(size[0]), int(size[1]))
+        key = (name, params, size, alpha)
+        image = self.memory.get(key)
+        if image is not None:
+            return image
+
+        digest = hashlib.sha1(f"{name}|{params!r}|{alpha}".encode('utf-8')).hexdigest()
+        disk_path = os.path.join(self.cache_dir, f"{size[0]}x{size[1]}", digest + '.raw')
+        image = self.load_from_disk(disk_path, size, alpha)
+
+        if image is None:
+            image = builder()
+            self.save_to_disk(disk_path, image, alpha)
+
+        self.memory[key] = image
+        return image
+
+    def get_source_hash(self, path):
+        """Хэш содержимого файла; пересчитывается только если файл изменился"""
+        stat = os.stat(path)
+        stat_key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self.source_hashes.get(stat_key)
+        if digest is None:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            self.source_hashes[stat_key] = digest
+        return digest
+
+    def get_disk_path(self, path, size, alpha):
+        # Ключ - содержимое исходника и разрешение, а не путь к нему
+        source_key = f"{self.get_source_hash(path)}|{alpha}"
+        digest = hashlib.sha1(source_key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{size[0]}x{size[1]}", digest + '.raw')
+
+    def load_from_disk(self, disk_path, size, alpha):
+        if not os.path.exists(disk_path):
+            return None
+
+        try:
+            with open(disk_path, 'rb') as f:
+                data = f.read()
+            image = pygame.image.frombytes(data, size, 'RGBA' if alpha else 'RGB')
+            return image.convert_alpha() if alpha else image.convert()
+        except Exception as e:
+            self.match_log.record(telemetry.ERROR, f"cache:read:{disk_path}", str(e))
+            return None
+
+    def save_to_disk(self, disk_path, image, alpha):
+        try:
+            os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+            temp_path = disk_path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(pygame.image.tobytes(image, 'RGBA' if alpha else 'RGB'))
+            os.replace(temp_path, disk_path)
+        except Exception as e:
+            self.match_log.record(telemetry.ERROR, f"cache:write:{disk_path}", str(e))
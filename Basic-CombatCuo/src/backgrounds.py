@@ -0,0 +1,74 @@
+import pygame
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Слои параллакса: (цвет, базовая высота в долях экрана, амплитуда, скорость прокрутки)
+PARALLAX_LAYERS = [
+    ((70, 90, 130), 0.45, 0.08, 0.2),
+    ((50, 65, 100), 0.30, 0.06, 0.5),
+]
+
+def make_gradient(size):
+    """Вертикальный градиент от синего к светлому, заполняется массивом целиком"""
+    width, height = size
+    surface = pygame.Surface(size)
+
+    if np is None:
+        for y in range(height):
+            color = (100, 150, max(50, 255 - y // 4))
+            pygame.draw.line(surface, color, (0, y), (width, y))
+        return surface
+
+    rows = np.arange(height)
+    pixels = np.empty((width, height, 3), dtype=np.uint8)
+    pixels[:, :, 0] = 100
+    pixels[:, :, 1] = 150
+    pixels[:, :, 2] = np.maximum(50, 255 - rows // 4)
+    pygame.surfarray.blit_array(surface, pixels)
+    return surface
+
+def ridge_heights(width, height, seed, base, amplitude):
+    """Высоты силуэта по столбцам; период равен ширине, чтобы слой тайлился"""
+    rng = random.Random(seed)
+    octaves = [(rng.randint(1, 3) * octave, rng.uniform(0, 2 * math.pi), 1.0 / octave)
+               for octave in (1, 2, 4)]
+
+    if np is None:
+        return [height * (base + amplitude * sum(
+                    weight * math.sin(2 * math.pi * waves * x / width + phase)
+                    for waves, phase, weight in octaves))
+                for x in range(width)]
+
+    columns = np.arange(width) * (2 * math.pi / width)
+    ridge = np.zeros(width)
+    for waves, phase, weight in octaves:
+        ridge += weight * np.sin(columns * waves + phase)
+    return height * (base + amplitude * ridge)
+
+def make_parallax_layer(size, seed, color, base, amplitude):
+    """Процедурный слой холмов с прозрачным небом"""
+    width, height = size
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    ridge = ridge_heights(width, height, seed, base, amplitude)
+
+    if np is None:
+        points = [(x, height - h) for x, h in enumerate(ridge)]
+        pygame.draw.polygon(surface, color, [(0, height)] + points + [(width, height)])
+        return surface
+
+    # Непрозрачны пиксели ниже линии хребта
+    rows = np.arange(height)
+    mask = rows[None, :] >= (height - ridge)[:, None]
+
+    pixels = pygame.surfarray.pixels3d(surface)
+    pixels[:] = color
+    del pixels
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    alpha[:] = mask * 255
+    del alpha
+    return surface
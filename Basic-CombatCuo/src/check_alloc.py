@@ -0,0 +1,183 @@
+import os
+import gc
+import sys
+import tracemalloc
+
+# Безголовый режим - окно и звук не нужны
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+WARMUP_TICKS = 120
+MEASURE_TICKS = 600
+# Допуск на выделения в куче за все измеряемые тики (байт)
+ALLOWED_BYTES = 0
+# Сгенерированная арена: платформы игрокам отдает сеточный индекс
+ARENA_SEED = 7
+
+class AllocationTracer:
+    """Считает все выделения памяти внутри кода, а не прирост между снимками.
+
+    Короткоживущий объект (Rect, словарь, связанный метод) освобождается
+    до конца тика, и разница снимков его не видит. Поэтому пик tracemalloc
+    сбрасывается на каждом событии трассировки (строка, вызов, возврат):
+    все, что выросло сверх памяти на начало строки, выделено этой строкой.
+    Собственные выделения трассировщика (числа из get_traced_memory)
+    калибруются заранее и вычитаются.
+    """
+
+    def __init__(self):
+        self.overhead = 0
+        self.start = 0
+        self.total = 0
+        # (файл, строка) -> байт
+        self.lines = {}
+
+    def trace(self, frame, event, arg):
+        current, peak = tracemalloc.get_traced_memory()
+        # На событии call пик включает сам объект кадра, который создает трассировка
+        if event != 'call':
+            grown = peak - self.start - self.overhead
+            if grown > 0:
+                self.total += grown
+                key = (os.path.basename(frame.f_code.co_filename), frame.f_lineno)
+                self.lines[key] = self.lines.get(key, 0) + grown
+        tracemalloc.reset_peak()
+        self.start = tracemalloc.get_traced_memory()[0]
+        return self.trace
+
+    def run(self, function):
+        tracemalloc.reset_peak()
+        self.start = tracemalloc.get_traced_memory()[0]
+        sys.settrace(self.trace)
+        try:
+            function()
+        finally:
+            sys.settrace(None)
+
+    def calibrate(self):
+        """Накладные расходы на событие - по функции, которая ничего не выделяет"""
+        def idle(value):
+            first = value
+            second = first
+            return second
+
+        self.overhead = 0
+        samples = []
+        for _ in range(20):
+            self.lines.clear()
+            self.run(lambda: idle(0))
+            # Каждая строка idle выполнилась один раз - значения по событиям
+            samples.extend(self.lines.values())
+        self.overhead = min(samples)
+        self.total = 0
+        self.lines.clear()
+
+class CountingConstructor:
+    """Подменяет pygame.Rect/Vector2 на время тика и считает вызовы.
+
+    Эти объекты pygame берет из своих списков свободных объектов, мимо
+    аллокатора, поэтому tracemalloc их не видит.
+    """
+
+    def __init__(self, module, name):
+        self.module = module
+        self.name = name
+        self.original = getattr(module, name)
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+        return self.original(*args, **kwargs)
+
+    def install(self):
+        setattr(self.module, self.name, self)
+
+    def remove(self):
+        setattr(self.module, self.name, self.original)
+
+def scripted_actions(game_manager, tick):
+    """Периодические прыжки, атаки и ходьба, чтобы пройти боевые ветки и приземления"""
+    for player in game_manager.players:
+        if tick % 40 == 0:
+            player.jump()
+        if tick % 90 == 0:
+            player.attack()
+        if tick % 150 == 0:
+            player.heavy_attack()
+        player.input_right = tick % 200 < 60
+        player.input_left = 100 <= tick % 200 < 160
+
+def measure(name, game_manager, ticks):
+    """Замер тиков одного матча; True, если выделений нет"""
+
+    # Прогрев: игроки приземляются, кэши интерпретатора заполняются
+    for tick in range(WARMUP_TICKS):
+        scripted_actions(game_manager, tick)
+        game_manager.update()
+
+    counters = [CountingConstructor(pygame, 'Rect'), CountingConstructor(pygame, 'Vector2')]
+    tracer = AllocationTracer()
+    # Без сборщика мусора: его проходы искажали бы счет
+    gc.disable()
+    tracemalloc.start()
+    try:
+        tracer.calibrate()
+        # Первый тик под трассировкой прогревает сам трассировщик - не в счет
+        tracer.run(game_manager.update)
+        tracer.total = 0
+        tracer.lines.clear()
+        for tick in range(WARMUP_TICKS, WARMUP_TICKS + ticks):
+            # Действия игроков - это ввод, а не тик: их таймеры создаются вне замера
+            scripted_actions(game_manager, tick)
+            for counter in counters:
+                counter.install()
+            try:
+                tracer.run(game_manager.update)
+            finally:
+                for counter in counters:
+                    counter.remove()
+    finally:
+        tracemalloc.stop()
+        gc.enable()
+
+    constructed = sum(counter.count for counter in counters)
+    print(f"{name}: тиков {ticks}, выделено в куче: {tracer.total} байт, "
+          f"создано Rect/Vector2: {constructed}")
+    for (filename, line), size in sorted(tracer.lines.items(), key=lambda item: -item[1])[:5]:
+        print(f"  {filename}:{line}: {size} байт")
+    for counter in counters:
+        if counter.count:
+            print(f"  pygame.{counter.name}: {counter.count}")
+
+    return tracer.total <= ALLOWED_BYTES and not constructed
+
+def check_alloc(ticks=MEASURE_TICKS):
+    """Проверяет, что тик симуляции GameManager.update ничего не выделяет"""
+    print("=== ПРОВЕРКА АЛЛОКАЦИЙ ТИКА ===")
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    assets_path = os.path.join(os.path.dirname(current_dir), 'assets')
+
+    pygame.init()
+    screen = pygame.display.set_mode((1000, 600))
+
+    from game_manager import GameManager
+    from telemetry import Telemetry
+    ok = True
+    for name, arena_seed in (("Арена по умолчанию", None), (f"Арена seed={ARENA_SEED}", ARENA_SEED)):
+        # Журнал отключен (его буфер растет по событиям), ввод задается сценарием:
+        # опрос клавиатуры pygame возвращает новый кортеж на каждый вызов
+        game_manager = GameManager(screen, assets_path, match_log=Telemetry(None),
+                                   audio=False, local_input=False, arena_seed=arena_seed)
+        ok = measure(name, game_manager, ticks) and ok
+
+    print(f"Результат: {'OK' if ok else 'ЕСТЬ АЛЛОКАЦИИ'}")
+    print("===============================")
+
+    pygame.quit()
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if check_alloc() else 1)
@@ -0,0 +1,72 @@
+import os
+import sys
+
+# Безголовый режим - окно и звук не нужны
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pygame
+
+SEEDS = 200
+
+def check_layout(seeds=SEEDS):
+    """Ярусы не ниже роста бойца, точки появления не пересекают платформы"""
+    from arena_generator import ArenaGenerator, GROUND_HEIGHT
+
+    bad = 0
+    for seed in range(seeds):
+        generator = ArenaGenerator(seed, 3200, 600)
+        arena = generator.generate()
+        player_width, player_height = generator.player_size
+        ground_top = arena.height - GROUND_HEIGHT
+
+        for platform in arena.platforms:
+            if platform.top != ground_top and platform.bottom > ground_top - player_height:
+                bad += 1
+        for x, y in arena.spawn_points:
+            rect = pygame.Rect(x, y, player_width, player_height)
+            if rect.collidelist(arena.platforms) != -1:
+                bad += 1
+    print(f"Арен: {seeds}, нарушений раскладки: {bad}")
+    return not bad
+
+def check_kill_plane():
+    """Боец, упавший ниже арены, погибает и возрождается на точке появления"""
+    from game_manager import GameManager
+    from telemetry import Telemetry
+
+    screen = pygame.display.set_mode((1000, 600))
+    assets_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets')
+    game_manager = GameManager(screen, assets_path, match_log=Telemetry(None),
+                               audio=False, local_input=False, level_number=None)
+    player = game_manager.players[0]
+    # Сбоку от арены, где под ногами пусто
+    player.position.update(-500, 0)
+    player.rect.topleft = (-500, 0)
+
+    for tick in range(300):
+        game_manager.update()
+        if player.actions['dead']:
+            break
+    died = player.actions['dead']
+    respawn_ticks = int(player.rules.respawn_ms / game_manager.tick_ms) + 10
+    for tick in range(respawn_ticks):
+        game_manager.update()
+    back = not player.actions['dead'] and player.rect.top < game_manager.kill_plane
+    print(f"Падение: гибель {'есть' if died else 'нет'}, "
+          f"возрождение {'есть' if back else 'нет'}")
+    return died and back
+
+def check_arena():
+    print("=== ПРОВЕРКА АРЕН ===")
+    pygame.init()
+    ok = check_layout()
+    ok = check_kill_plane() and ok
+    pygame.quit()
+    print(f"Результат: {'OK' if ok else 'ОШИБКА'}")
+    print("=====================")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if check_arena() else 1)
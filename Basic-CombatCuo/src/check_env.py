@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def check_env():
+    """Проверяет, что удар в CombatEnv попадает: урон и награда атакующему"""
+    from combat_env import CombatEnv, MOVES, ACTIONS
+
+    print("=== ПОПАДАНИЕ В COMBAT ENV ===")
+    env = CombatEnv(frame_skip=1)
+    env.reset()
+    attacker, defender = env.players
+    # Вплотную на земле, лицом друг к другу
+    ground = env.game_manager.platforms[0].top
+    for player, x, facing_right in ((attacker, 400, True), (defender, 460, False)):
+        player.set_spawn(x, ground - player.rect.height)
+        player.facing_right = facing_right
+
+    # Действие = индекс действия * число движений + индекс движения
+    attack = ACTIONS.index('attack') * len(MOVES) + MOVES.index(None)
+    idle = ACTIONS.index(None) * len(MOVES) + MOVES.index(None)
+    reward = 0.0
+    env.step([attack, idle])
+    for _ in range(120):
+        reward += env.step([idle, idle])[1][0]
+
+    damage = attacker.rules.attack.damage
+    ok = defender.health == defender.rules.health - damage and reward > 0
+    print(f"Здоровье защитника: {defender.health}/{defender.rules.health}, "
+          f"награда атакующего: {reward:.1f}")
+    print(f"Результат: {'OK' if ok else 'ОШИБКА'}")
+    print("==============================")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if check_env() else 1)
@@ -0,0 +1,104 @@
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from headless import init_headless, get_default_assets_path
+
+def simulate_edge(player, graph, platforms, source, target, action, takeoff_x):
+    """Прогоняет переход настоящей физикой Player; True - приземлился на цель"""
+    span = graph.spans[source]
+    low, high = graph.standing_range(span)
+    # Для спуска встаем на краю и идем к точке схода
+    start_x = takeoff_x if action == 'jump' else min(max(takeoff_x, low), high)
+    player.reset()
+    player.set_spawn(start_x, span[2] - player.rect.height)
+    player.on_ground = True
+    player.input_left = player.input_right = False
+
+    if action == 'jump':
+        player.jump()
+    else:
+        walk_right = takeoff_x > start_x
+        player.input_right, player.input_left = walk_right, not walk_right
+
+    airborne = action == 'jump'
+    for _ in range(600):
+        clear = player.rect.left >= span[1] or player.rect.right <= span[0]
+        if action == 'jump' or clear:
+            # То же управление, которым граф проверял переход
+            direction = graph.steer(player.rect.x, player.rect.bottom, target)
+            player.input_right = direction > 0
+            player.input_left = direction < 0
+        player.update(platforms, [player])
+        if not player.on_ground:
+            airborne = True
+        elif airborne:
+            return graph.find_span(player.rect) == target
+    return False
+
+def check_level(name, platforms, spans, player):
+    import navigation
+
+    start = time.perf_counter()
+    graph = navigation.NavGraph(spans or navigation.merge_platform_spans(platforms),
+                                navigation.agent_profile(player), platforms)
+    build_time = time.perf_counter() - start
+    edge_count = sum(len(edges) for edges in graph.edges)
+    failed = []
+    for source, edges in enumerate(graph.edges):
+        for target, action, takeoff_x, _ in edges:
+            if not simulate_edge(player, graph, platforms, source, target, action, takeoff_x):
+                failed.append((source, target, action))
+
+    # A* без кэша и с кэшем на случайных парах отрезков
+    rng = random.Random(0)
+    pairs = [(rng.randrange(len(graph.spans)), rng.randrange(len(graph.spans))) for _ in range(2000)]
+    start = time.perf_counter()
+    for a, b in pairs:
+        graph.path_cache.clear()
+        graph.find_path(a, b)
+    cold = (time.perf_counter() - start) / len(pairs)
+    for a, b in pairs:
+        graph.find_path(a, b)
+    start = time.perf_counter()
+    found = sum(1 for a, b in pairs if graph.find_path(a, b) is not None)
+    warm = (time.perf_counter() - start) / len(pairs)
+
+    print(f"{name}: отрезков {len(graph.spans)}, переходов {edge_count}, "
+          f"не подтверждено физикой {len(failed)}, построение {build_time * 1000:.0f} мс")
+    print(f"  A*: {cold * 1e6:.0f} мкс на запрос, из кэша {warm * 1e6:.1f} мкс; "
+          f"путь есть для {found} из {len(pairs)} пар")
+    for source, target, action in failed[:5]:
+        print(f"  ! {action} {graph.spans[source]} -> {graph.spans[target]}")
+    return not failed
+
+def check_nav():
+    init_headless()
+    import pygame
+    from game_manager import GameManager
+    from level_outline import Level
+    from player import Player
+    from telemetry import Telemetry
+
+    print("=== ГРАФ НАВИГАЦИИ ===")
+    assets_path = get_default_assets_path()
+    screen = pygame.Surface((1000, 600))
+    player = Player(0, 0, screen, assets_path)
+
+    ok = True
+    game_manager = GameManager(screen, assets_path, match_log=Telemetry(None), audio=False, local_input=False)
+    ok &= check_level("Арена по умолчанию", game_manager.platforms, None, player)
+    level = Level(screen, assets_path, game_manager.asset_cache)
+    ok &= check_level("Уровень Level", level.platforms, None, player)
+    generated = GameManager(screen, assets_path, match_log=Telemetry(None), audio=False,
+                            local_input=False, arena_seed=7)
+    ok &= check_level("Арена seed=7", generated.platforms, generated.arena.spans, player)
+
+    print(f"Результат: {'OK' if ok else 'ОШИБКА'}")
+    print("======================")
+    return ok
+
+if __name__ == "__main__":
+    check_nav()
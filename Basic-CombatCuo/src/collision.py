@@ -0,0 +1,77 @@
+NO_HIT = (1.0, 0, 0)
+
+def sweep_aabb(x, y, width, height, dx, dy, other):
+    """Swept AABB: время первого касания (0..1) движущегося бокса с other.
+
+    Возвращает (время, нормаль_x, нормаль_y); если за шаг касания нет - NO_HIT.
+    Уже пересекающиеся боксы не считаются касанием - их разводит resolve_collision.
+    """
+    right = x + width
+    bottom = y + height
+
+    # Время входа и выхода по оси X
+    if dx > 0:
+        tx_entry = (other.left - right) / dx
+        tx_exit = (other.right - x) / dx
+    elif dx < 0:
+        tx_entry = (other.right - x) / dx
+        tx_exit = (other.left - right) / dx
+    elif right <= other.left or x >= other.right:
+        return NO_HIT
+    else:
+        tx_entry = float('-inf')
+        tx_exit = float('inf')
+
+    # Время входа и выхода по оси Y
+    if dy > 0:
+        ty_entry = (other.top - bottom) / dy
+        ty_exit = (other.bottom - y) / dy
+    elif dy < 0:
+        ty_entry = (other.bottom - y) / dy
+        ty_exit = (other.top - bottom) / dy
+    elif bottom <= other.top or y >= other.bottom:
+        return NO_HIT
+    else:
+        ty_entry = float('-inf')
+        ty_exit = float('inf')
+
+    entry_time = max(tx_entry, ty_entry)
+    exit_time = min(tx_exit, ty_exit)
+
+    if entry_time > exit_time or entry_time < 0 or entry_time >= 1.0:
+        return NO_HIT
+
+    # Нормаль - по оси, которая вошла в контакт последней
+    if tx_entry > ty_entry:
+        return (entry_time, -1 if dx > 0 else 1, 0)
+    return (entry_time, 0, -1 if dy > 0 else 1)
+
+def sweep_platforms(x, y, width, height, dx, dy, platforms):
+    """Ближайшее касание среди платформ с отсечением по габаритам всего шага"""
+    # Габариты области, которую бокс заметает за шаг
+    min_x = x + dx if dx < 0 else x
+    max_x = x + width + dx if dx > 0 else x + width
+    min_y = y + dy if dy < 0 else y
+    max_y = y + height + dy if dy > 0 else y + height
+
+    best = NO_HIT
+    for platform in platforms:
+        if (platform.right < min_x or platform.left > max_x or
+                platform.bottom < min_y or platform.top > max_y):
+            continue
+
+        hit = sweep_aabb(x, y, width, height, dx, dy, platform)
+        if hit[0] < best[0]:
+            best = hit
+    return best
+
+def merge_platform_spans(platforms):
+    """Сливает касающиеся платформы с одинаковым верхом в отрезки (left, right, top)"""
+    spans = []
+    for platform in sorted(platforms, key=lambda p: (p.top, p.left)):
+        if spans and spans[-1][2] == platform.top and platform.left <= spans[-1][1]:
+            left, right, top = spans[-1]
+            spans[-1] = (left, max(right, platform.right), top)
+        else:
+            spans.append((platform.left, platform.right, platform.top))
+    return spans
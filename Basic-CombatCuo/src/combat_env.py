@@ -0,0 +1,272 @@
+import os
+import sys
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+from headless import init_headless, get_default_assets_path
+
+# Действие игрока - одно число: движение + действие (3 * 5 = 15 вариантов)
+MOVES = (None, 'left', 'right')
+ACTIONS = (None, 'jump', 'attack', 'heavy_attack', 'block')
+NUM_ACTIONS = len(MOVES) * len(ACTIONS)
+
+ACTION_FLAGS = ('attacking', 'heavy_attacking', 'blocking', 'stunned', 'dead', 'respawning')
+# Кулдауны; нормализуются на полную длительность из правил персонажа
+COOLDOWN_NAMES = ('attack', 'heavy_attack', 'stun')
+# x, y, vx, vy, здоровье, направление, на земле + флаги + кулдауны
+PLAYER_FEATURES = 7 + len(ACTION_FLAGS) + len(COOLDOWN_NAMES)
+NUM_PLAYERS = 2
+OBSERVATION_SIZE = NUM_PLAYERS * PLAYER_FEATURES
+
+class CombatEnv:
+    """Безголовая среда в стиле Gym вокруг GameManager: reset() и step(actions)"""
+
+    WORLD_SIZE = (1000, 600)
+    # Спрайты боту не нужны - кадры грузятся в 1x1, симуляция от масштаба не зависит
+    RENDER_SCALE = 0.01
+
+    def __init__(self, assets_path=None, frame_skip=4, max_steps=1000,
+                 observation=None, rewards=None):
+        init_headless()
+        import pygame
+        from game_manager import GameManager
+        from telemetry import Telemetry
+
+        screen = pygame.Surface((int(self.WORLD_SIZE[0] * self.RENDER_SCALE),
+                                 int(self.WORLD_SIZE[1] * self.RENDER_SCALE)))
+        self.game_manager = GameManager(screen, assets_path or get_default_assets_path(),
+                                        self.RENDER_SCALE, match_log=Telemetry(None),
+                                        audio=False, local_input=False, level_number=None)
+        self.players = self.game_manager.players
+        self.frame_skip = frame_skip
+        self.max_steps = max_steps
+        self.steps = 0
+
+        # Буферы можно передать снаружи (строки общего массива векторной среды)
+        self.observation = observation if observation is not None else np.zeros(OBSERVATION_SIZE, np.float32)
+        self.rewards = rewards if rewards is not None else np.zeros(NUM_PLAYERS, np.float32)
+
+    def reset(self):
+        self.game_manager.time_ms = 0.0
+        self.game_manager.scheduler.reset()
+        for player in self.players:
+            player.reset()
+        self.steps = 0
+        self.rewards[:] = 0
+        self.write_observation()
+        return self.observation
+
+    def step(self, actions):
+        """Применяет по действию на игрока, делает frame_skip тиков.
+
+        Награда игрока - нанесенный урон минус полученный.
+        Эпизод заканчивается смертью любого игрока или по max_steps.
+        """
+        players = self.players
+        for player, action in zip(players, actions):
+            self.apply_action(player, int(action))
+
+        health_before = [player.health for player in players]
+        done = False
+        for _ in range(self.frame_skip):
+            self.game_manager.update()
+            if players[0].actions['dead'] or players[1].actions['dead']:
+                done = True
+                break
+
+        taken_0 = health_before[0] - players[0].health
+        taken_1 = health_before[1] - players[1].health
+        self.rewards[0] = taken_1 - taken_0
+        self.rewards[1] = taken_0 - taken_1
+
+        self.steps += 1
+        if self.steps >= self.max_steps:
+            done = True
+
+        self.write_observation()
+        return self.observation, self.rewards, done, {'steps': self.steps}
+
+    def apply_action(self, player, action):
+        move = MOVES[action % len(MOVES)]
+        act = ACTIONS[action // len(MOVES)]
+
+        player.input_left = move == 'left'
+        player.input_right = move == 'right'
+
+        # Блок удерживается, пока агент выбирает его на каждом шаге
+        if act == 'block':
+            if not player.actions['blocking']:
+                player.handle_action('block', True)
+        else:
+            if player.actions['blocking']:
+                player.handle_action('block', False)
+            if act:
+                player.handle_action(act, True)
+
+    def write_observation(self):
+        width, height = self.game_manager.world_width, self.game_manager.world_height
+        values = []
+        for player in self.players:
+            actions = player.actions
+            values += (player.position.x / width, player.position.y / height,
+                       player.velocity.x / player.speed, player.velocity.y / -player.jump_power,
+                       player.health / player.rules.health, 1.0 if player.facing_right else -1.0,
+                       1.0 if player.on_ground else 0.0)
+            values += [1.0 if actions[flag] else 0.0 for flag in ACTION_FLAGS]
+            scales = (player.rules.attack.cooldown, player.rules.heavy_attack.cooldown, player.rules.hit_stun)
+            values += [player.cooldown_remaining(name) / scale for name, scale in zip(COOLDOWN_NAMES, scales)]
+        self.observation[:] = values
+
+class VectorCombatEnv:
+    """N независимых матчей в одном процессе; результаты - в непрерывных массивах"""
+
+    def __init__(self, num_envs, observations=None, rewards=None, dones=None, **env_kwargs):
+        self.num_envs = num_envs
+        self.observations = observations if observations is not None else \
+            np.zeros((num_envs, OBSERVATION_SIZE), np.float32)
+        self.rewards = rewards if rewards is not None else np.zeros((num_envs, NUM_PLAYERS), np.float32)
+        self.dones = dones if dones is not None else np.zeros(num_envs, bool)
+
+        self.envs = [CombatEnv(observation=self.observations[i], rewards=self.rewards[i], **env_kwargs)
+                     for i in range(num_envs)]
+
+    def reset(self):
+        for env in self.envs:
+            env.reset()
+        self.dones[:] = False
+        return self.observations
+
+    def step(self, actions):
+        """actions - массив (num_envs, 2); законченные матчи сразу перезапускаются"""
+        for i, env in enumerate(self.envs):
+            _, _, done, _ = env.step(actions[i])
+            self.dones[i] = done
+            if done:
+                # Награда последнего шага сохраняется, наблюдение - уже нового эпизода
+                rewards = env.rewards.copy()
+                env.reset()
+                env.rewards[:] = rewards
+        return self.observations, self.rewards, self.dones
+
+def create_shared_array(shape, dtype):
+    size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    memory = shared_memory.SharedMemory(create=True, size=size)
+    return memory, np.ndarray(shape, dtype, buffer=memory.buf)
+
+def attach_shared_array(name, shape, dtype):
+    memory = shared_memory.SharedMemory(name=name)
+    return memory, np.ndarray(shape, dtype, buffer=memory.buf)
+
+def worker_main(connection, layout, start, end, env_kwargs):
+    """Процесс-воркер: ведет свою часть матчей прямо в общей памяти"""
+    memories = []
+    arrays = {}
+    for key, (name, shape, dtype) in layout.items():
+        memory, array = attach_shared_array(name, shape, dtype)
+        memories.append(memory)
+        arrays[key] = array[start:end]
+
+    vector_env = VectorCombatEnv(end - start, arrays['observations'], arrays['rewards'],
+                                 arrays['dones'], **env_kwargs)
+    try:
+        while True:
+            command = connection.recv()
+            if command == 'step':
+                vector_env.step(arrays['actions'])
+            elif command == 'reset':
+                vector_env.reset()
+            elif command == 'close':
+                break
+            connection.send(True)
+    finally:
+        del arrays, vector_env
+        for memory in memories:
+            memory.close()
+
+class SubprocVectorEnv:
+    """Матчи, разделенные между процессами; обмен идет через shared_memory без копирования"""
+
+    def __init__(self, num_envs, num_workers=None, **env_kwargs):
+        self.num_envs = num_envs
+        num_workers = min(num_envs, num_workers or os.cpu_count() or 1)
+
+        self.memories = []
+        layout = {}
+        for key, shape, dtype in (('observations', (num_envs, OBSERVATION_SIZE), np.float32),
+                                  ('rewards', (num_envs, NUM_PLAYERS), np.float32),
+                                  ('dones', (num_envs,), np.bool_),
+                                  ('actions', (num_envs, NUM_PLAYERS), np.int32)):
+            memory, array = create_shared_array(shape, dtype)
+            self.memories.append(memory)
+            setattr(self, key, array)
+            layout[key] = (memory.name, shape, dtype)
+
+        # spawn, а не fork: SDL плохо переносит копирование состояния процесса
+        context = multiprocessing.get_context('spawn')
+        self.connections = []
+        self.workers = []
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            parent, child = context.Pipe()
+            worker = context.Process(target=worker_main,
+                                     args=(child, layout, int(start), int(end), env_kwargs),
+                                     daemon=True)
+            worker.start()
+            self.connections.append(parent)
+            self.workers.append(worker)
+
+    def send_all(self, command):
+        for connection in self.connections:
+            connection.send(command)
+        for connection in self.connections:
+            connection.recv()
+
+    def reset(self):
+        self.send_all('reset')
+        return self.observations
+
+    def step(self, actions):
+        """Возвращает представления общих массивов - копируйте, если нужны между шагами"""
+        self.actions[:] = actions
+        self.send_all('step')
+        return self.observations, self.rewards, self.dones
+
+    def close(self):
+        for connection in self.connections:
+            connection.send('close')
+        for worker in self.workers:
+            worker.join()
+        del self.observations, self.rewards, self.dones, self.actions
+        for memory in self.memories:
+            memory.close()
+            memory.unlink()
+
+def benchmark(num_envs=64, steps=200):
+    """Замер пропускной способности: шагов среды в секунду (в процессе и по процессам)"""
+    print("=== ПРОПУСКНАЯ СПОСОБНОСТЬ СРЕДЫ ===")
+    rng = np.random.default_rng(0)
+
+    vector_env = VectorCombatEnv(num_envs)
+    vector_env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        vector_env.step(rng.integers(0, NUM_ACTIONS, (num_envs, NUM_PLAYERS)))
+    elapsed = time.perf_counter() - start
+    print(f"Один процесс: {num_envs * steps / elapsed:.0f} шагов/с "
+          f"({num_envs * steps * vector_env.envs[0].frame_skip / elapsed:.0f} тиков/с)")
+
+    subproc_env = SubprocVectorEnv(num_envs)
+    subproc_env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        subproc_env.step(rng.integers(0, NUM_ACTIONS, (num_envs, NUM_PLAYERS)))
+    elapsed = time.perf_counter() - start
+    print(f"{len(subproc_env.workers)} процессов: {num_envs * steps / elapsed:.0f} шагов/с")
+    subproc_env.close()
+    print("===================================")
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    benchmark()
@@ -1,18 +1,109 @@
 import pygame
 import os
+import time
+import threading
+from collections import deque
 from player import Player
+from asset_cache import AssetCache
+from texture_manager import TextureManager
+from input_router import InputRouter
+from scheduler import Scheduler
+import telemetry
+from telemetry import Telemetry
+import arena_generator
+import navigation
+from level_outline import Level
+from startup_trace import trace
+import rules
 
 class GameManager:
-    def __init__(self, screen, assets_path):
+    def __init__(self, screen, assets_path, render_scale=1.0, match_log=None,
+                 arena_seed=None, arena_size=None, texture_budget=64 * 1024 * 1024,
+                 audio=True, local_input=True, deferred_init=False, rules_path=None,
+                 characters=(rules.DEFAULT_CHARACTER, rules.DEFAULT_CHARACTER), level_number=1):
         self.screen = screen
         self.assets_path = assets_path
         self.debug_mode = False
         
+        # Время симуляции: растет на фиксированный шаг за тик, поэтому таймеры
+        # атак и возрождения не зависят от реального времени (важно для безголового режима)
+        self.time_ms = 0.0
+        self.tick_ms = 1000.0 / 60
+        # Общий планировщик таймеров: конец атак, оглушения, возрождение
+        self.scheduler = Scheduler()
+        
+        # Журнал матча; Telemetry(None) - ничего не пишет
+        self.telemetry = match_log or Telemetry(self.get_default_log_path())
+        
+        # screen - внутренняя поверхность отрисовки, мир всегда в логических
+        # координатах; render_scale переводит их в пиксели этой поверхности
+        self.render_scale = render_scale
+        self.world_width = round(screen.get_width() / render_scale)
+        self.world_height = round(screen.get_height() / render_scale)
+        with trace.span('asset_cache'):
+            self.asset_cache = AssetCache(assets_path, match_log=self.telemetry)
+        # Правила персонажей: файл компилируется один раз на процесс
+        with trace.span('rules'):
+            self.rules = rules.load_rules(rules_path or rules.get_default_rules_path(assets_path))
+        # Фон уровня (картинка levelN.jpg или градиент с параллаксом);
+        # None - без фона, для безголовой симуляции. Клавиша N - следующий уровень
+        self.level_count = 3
+        with trace.span('level'):
+            self.level = Level(screen, assets_path, self.asset_cache, level_number,
+                               (self.world_width, self.world_height)) if level_number else None
+        # Бюджет памяти на кадры анимаций всех сущностей
+        self.texture_manager = TextureManager(texture_budget)
+        
         self.sounds = {}
-        self.load_sounds()
+        # Сколько раз звучал каждый звук - по этим счетчикам звук
+        # воспроизводит отрисовка, когда симуляция идет отдельно
+        self.sound_counts = {}
+        self.audio = audio
+        # При отложенной инициализации звук и шрифты поднимает finish_deferred_init
+        # после первого кадра; до этого HUD рисуется без текста
+        self.fonts_ready = not deferred_init
+        self.fonts = {}
+        # Журнал матча рассчитан на одного писателя: поток звука не пишет в него
+        # сам, а передает ошибки сюда, и их записывает update
+        self.audio_thread = None
+        self.audio_errors = deque()
+        if audio and not deferred_init:
+            with trace.span('load_sounds'):
+                self.load_sounds()
         
         # Создаем двух одинаковых игроков
-        self.players = [
+        with trace.span('players'):
+            self.players = self.create_players(screen, assets_path, characters)
+        
+        # Общая таблица ввода для всех игроков; без нее ввод задается извне
+        # через player.handle_action и флаги input_left/input_right
+        self.input_router = InputRouter(self.players) if local_input else None
+        
+        self.camera_offset = [0, 0]
+        # Положение камеры на предыдущем тике - для интерполяции отрисовки
+        self.previous_camera_offset = [0, 0]
+        self.camera_smoothness = 0.05
+        
+        # Арена: фиксированная или сгенерированная по seed
+        self.arena_seed = arena_seed
+        self.arena_size = arena_size or (self.world_width * 8, self.world_height)
+        # Плоскость смерти: упавший в провал ниже арены погибает и возрождается
+        self.kill_plane = self.arena_size[1] + 200
+        self.arena = None
+        with trace.span('arena'):
+            self.platforms = self.create_arena()
+        
+        # Режим выживания против орды существ (включается клавишей H)
+        self.horde = None
+        self.horde_size = 5000
+        self.horde_spawn_rate = 50
+        self.horde_contact_damage = 5
+        
+        # Сплошные маски хитбоксов атак по размеру
+        self.box_masks = {}
+    
+    def create_players(self, screen, assets_path, characters):
+        return [
             # Игрок 1 - WASD + QE
             Player(300, 300, screen, assets_path, self, 
                   controls={
@@ -23,7 +114,7 @@ class GameManager:
                       'heavy_attack': pygame.K_q,
                       'block': pygame.K_s
                   },
-                  player_id=1, facing_right=True),
+                  player_id=1, facing_right=True, character=characters[0]),
             
             # Игрок 2 - Стрелки + KL  
             Player(700, 300, screen, assets_path, self,
@@ -35,18 +126,56 @@ class GameManager:
                       'heavy_attack': pygame.K_k,
                       'block': pygame.K_DOWN
                   },
-                  player_id=2, facing_right=False)
+                  player_id=2, facing_right=False, character=characters[1])
         ]
-        
-        self.camera_offset = [0, 0]
-        self.camera_smoothness = 0.05
-        
-        # Арена
-        self.platforms = self.create_arena()
+    
+    def get_default_log_path(self):
+        logs_path = os.path.join(os.path.dirname(self.assets_path), 'logs')
+        return os.path.join(logs_path, time.strftime('match_%Y%m%d_%H%M%S.jsonl'))
+    
+    def close(self):
+        """Дописывает журнал матча перед выходом"""
+        self.telemetry.close()
+    
+    def finish_deferred_init(self):
+        """Вторая половина запуска - после первого кадра: шрифты и звук"""
+        self.fonts_ready = True
+        if self.audio:
+            # Открытие аудиоустройства и декодирование звуков не держат цикл кадров
+            self.audio_thread = threading.Thread(target=self.load_deferred_audio, name='audio', daemon=True)
+            self.audio_thread.start()
+    
+    def load_deferred_audio(self):
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error as e:
+            self.report_error('mixer', str(e))
+            return
+        self.load_sounds()
+    
+    def report_error(self, source, message):
+        """Ошибка в журнал матча; из потока звука - через очередь audio_errors"""
+        if threading.current_thread() is self.audio_thread:
+            self.audio_errors.append((source, message))
+        else:
+            self.telemetry.record(telemetry.ERROR, source, message)
+    
+    def get_font(self, size):
+        """Шрифт из кэша; None, пока шрифты еще не подняты"""
+        if not self.fonts_ready:
+            return None
+        font = self.fonts.get(size)
+        if font is None:
+            font = self.fonts[size] = pygame.font.Font(None, size)
+        return font
     
     def create_arena(self):
         """Создает арену для битвы"""
-        screen_width, screen_height = self.screen.get_size()
+        if self.arena_seed is not None:
+            return self.create_generated_arena()
+        
+        screen_width, screen_height = self.world_width, self.world_height
         return [
             # Основная платформа
             pygame.Rect(0, screen_height - 50, screen_width, 50),
@@ -56,6 +185,28 @@ class GameManager:
             pygame.Rect(700, 400, 150, 25)
         ]
     
+    def create_generated_arena(self):
+        """Берет арену из дискового кэша или генерирует ее по seed"""
+        width, height = self.arena_size
+        self.arena = arena_generator.load_or_generate(
+            self.arena_seed, width, height, self.asset_cache.cache_dir, self.telemetry)
+        
+        for player, (x, y) in zip(self.players, self.arena.spawn_points):
+            player.set_spawn(x, y)
+        
+        return self.arena.platforms
+    
+    def get_nearby_platforms(self, rect):
+        """Платформы рядом с rect; на сгенерированной арене - через сеточный индекс"""
+        if self.arena:
+            return self.arena.nearby(rect)
+        return self.platforms
+    
+    def get_nav_graph(self, entity):
+        """Граф переходов между платформами арены для движения как у entity"""
+        spans = self.arena.spans if self.arena else None
+        return navigation.get_nav_graph(self.platforms, navigation.agent_profile(entity), spans)
+    
     def load_sounds(self):
         sound_config = {
             'background': ('background_music.mp3', None),
@@ -83,7 +234,7 @@ class GameManager:
                         sound.set_volume(volume)
                     self.sounds[sound_name] = sound
         except Exception as e:
-            print(f"Ошибка загрузки {sound_name}: {e}")
+            self.report_error(f"sound:{sound_name}", str(e))
             self.sounds[sound_name] = None
     
     def play_background_music(self):
@@ -93,49 +244,142 @@ class GameManager:
                 pygame.mixer.music.set_volume(0.3)
                 pygame.mixer.music.play(-1)
             except Exception as e:
-                print(f"Ошибка музыки: {e}")
+                self.report_error('music', str(e))
     
     def play_sound(self, sound_name):
+        self.sound_counts[sound_name] = self.sound_counts.get(sound_name, 0) + 1
         sound = self.sounds.get(sound_name)
         if sound and hasattr(sound, 'play'):
             try:
                 sound.play()
             except Exception as e:
-                print(f"Ошибка звука {sound_name}: {e}")
+                self.telemetry.record(telemetry.ERROR, f"sound:{sound_name}", str(e))
     
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
             # Переключение режима отладки по клавише I
             if event.key == pygame.K_i:
                 self.debug_mode = not self.debug_mode
-                print(f"Режим отладки: {'ВКЛ' if self.debug_mode else 'ВЫКЛ'}")
+                self.telemetry.record(telemetry.TOGGLE, 'debug', self.debug_mode)
+            # Режим орды по клавише H
+            elif event.key == pygame.K_h:
+                self.toggle_horde_mode()
+            # Следующий уровень по клавише N
+            elif event.key == pygame.K_n and self.level:
+                self.next_level()
         
-        for player in self.players:
-            player.handle_event(event)
+        if self.input_router:
+            self.input_router.handle_event(event)
     
-    def update(self):
+    def update(self, dt=1.0):
+        # Запоминаем состояние прошлого тика для интерполяции
+        for player in self.players:
+            player.store_previous_state()
+        self.previous_camera_offset[0] = self.camera_offset[0]
+        self.previous_camera_offset[1] = self.camera_offset[1]
+        
+        self.time_ms += self.tick_ms * dt
+        self.scheduler.advance(self.time_ms)
+        
+        # Ошибки загрузки звука из фонового потока
+        while self.audio_errors:
+            self.telemetry.record(telemetry.ERROR, *self.audio_errors.popleft())
+        
+        # Один опрос клавиатуры на всех игроков
+        if self.input_router:
+            self.input_router.sample()
+        
         # Обновляем игроков
         for player in self.players:
-            player.update(self.platforms, self.players)
+            player.update(self.get_nearby_platforms(player.rect), self.players, dt)
+            if player.rect.top > self.kill_plane and not player.actions['dead']:
+                player.die()
         
         # Проверяем столкновения атак
         self.check_attacks()
         
+        if self.horde:
+            self.update_horde(dt)
+        
         self.update_camera()
     
+    def next_level(self):
+        """Меняет фон на следующий уровень; декодированные картинки берутся из кэша"""
+        level_number = self.level.level_number % self.level_count + 1
+        self.level = Level(self.screen, self.assets_path, self.asset_cache, level_number,
+                           (self.world_width, self.world_height))
+        self.telemetry.record(telemetry.TOGGLE, 'level', level_number)
+    
+    def toggle_horde_mode(self):
+        if self.horde:
+            self.horde.release()
+            self.horde = None
+            self.telemetry.record(telemetry.TOGGLE, 'horde', False)
+            return
+        
+        try:
+            from horde import Horde
+        except ImportError as e:
+            self.telemetry.record(telemetry.ERROR, 'horde', f"нужен numpy: {e}")
+            return
+        
+        self.horde = Horde(self.screen, self.assets_path, self.horde_size,
+                           self.asset_cache, self.render_scale, self.texture_manager,
+                           attackers=len(self.players), match_log=self.telemetry)
+        self.telemetry.record(telemetry.TOGGLE, 'horde', True)
+    
+    def update_horde(self, dt):
+        """Пополняет орду, двигает ее пакетно и разбирает контакты с игроками"""
+        horde = self.horde
+        
+        if horde.alive_count < self.horde_size:
+            horde.spawn(self.horde_spawn_rate, 0, self.world_width, -horde.height)
+        
+        targets = [player.rect.centerx for player in self.players if not player.actions['dead']]
+        if not targets:
+            targets = [self.world_width // 2]
+        horde.update(self.platforms, targets, self.kill_plane, dt)
+        
+        for player in self.players:
+            # Активный удар задевает всех существ в хитбоксе - каждое один раз за замах
+            if player.attack_active:
+                horde.hit(player.attack_hitbox, player.attack_damage, player.player_id - 1, player.swings)
+            
+            # Контакт с ордой ранит игрока (оглушение ограничивает частоту урона)
+            if not player.actions['stunned'] and horde.touches(player.rect):
+                player.take_damage(self.horde_contact_damage)
+    
     def check_attacks(self):
         """Проверяет столкновения атак между игроками"""
-        for i, attacker in enumerate(self.players):
-            if not attacker.actions['attacking']:
+        # Без enumerate: тик не создает объектов-итераторов
+        for attacker in self.players:
+            # Хитбокс бьет только в активном окне удара, не на замахе
+            if not attacker.attack_active:
                 continue
                 
-            for j, defender in enumerate(self.players):
-                if i == j:
+            for defender in self.players:
+                if defender is attacker:
                     continue
                     
-                if attacker.attack_hitbox.colliderect(defender.rect):
+                if self.attack_hits(attacker, defender):
                     self.handle_attack_hit(attacker, defender)
     
+    def attack_hits(self, attacker, defender):
+        """Хитбокс атаки против непрозрачных пикселей текущего кадра защитника"""
+        hitbox = attacker.attack_hitbox
+        mask, sprite_rect = defender.get_hurt_mask()
+        
+        # Сначала дешевая проверка габаритов, маски - только при пересечении
+        if not hitbox.colliderect(sprite_rect):
+            return False
+        
+        box_mask = self.box_masks.get(hitbox.size)
+        if box_mask is None:
+            box_mask = self.box_masks[hitbox.size] = pygame.mask.Mask(hitbox.size, fill=True)
+        
+        offset = (hitbox.x - sprite_rect.x, hitbox.y - sprite_rect.y)
+        return mask.overlap(box_mask, offset) is not None
+    
     def handle_attack_hit(self, attacker, defender):
         """Обрабатывает попадание атаки"""
         # Если защитник блокирует и смотрит в правильную сторону
@@ -143,22 +387,27 @@ class GameManager:
             defender.is_facing_attacker(attacker)):
             
             # Обычный блок
-            defender.take_damage(attacker.attack_damage * 0.2)
-            self.play_sound('block')
+            damage = defender.take_damage(attacker.attack_damage * defender.rules.block_damage_scale)
+            if damage:
+                self.telemetry.record(telemetry.BLOCK, attacker.player_id, defender.player_id, damage)
+                self.play_sound('block')
         else:
-            # Обычное попадание
-            defender.take_damage(attacker.attack_damage)
-            defender.knockback(attacker.facing_right, 8 if attacker.actions['heavy_attacking'] else 5)
-            self.play_sound('hit')
-            
-            if attacker.actions['heavy_attacking']:
-                self.play_sound('heavy_attack')
-            else:
-                self.play_sound('attack')
+            # Обычное попадание; по мертвому или возрождающемуся урон не проходит
+            heavy = attacker.actions['heavy_attacking']
+            damage = defender.take_damage(attacker.attack_damage)
+            if damage:
+                self.telemetry.record(telemetry.HIT, attacker.player_id, defender.player_id,
+                                      damage, heavy)
+                defender.knockback(attacker.facing_right, attacker.current_move.knockback)
+                self.play_sound('hit')
+                
+                if heavy:
+                    self.play_sound('heavy_attack')
+                else:
+                    self.play_sound('attack')
         
         # Сбрасываем атаку после попадания
-        attacker.actions['attacking'] = False
-        attacker.actions['heavy_attacking'] = False
+        attacker.end_attack()
     
     def update_camera(self):
         """Камера следует за серединой между игроками"""
@@ -166,75 +415,132 @@ class GameManager:
             center_x = (self.players[0].rect.centerx + self.players[1].rect.centerx) // 2
             center_y = (self.players[0].rect.centery + self.players[1].rect.centery) // 2
             
-            target_x = center_x - self.screen.get_width() // 2
-            target_y = center_y - self.screen.get_height() // 2
+            target_x = center_x - self.world_width // 2
+            target_y = center_y - self.world_height // 2
             
             self.camera_offset[0] += (target_x - self.camera_offset[0]) * self.camera_smoothness
             self.camera_offset[1] += (target_y - self.camera_offset[1]) * self.camera_smoothness
     
-    def draw(self):
-        # Очищаем экран
-        self.screen.fill((50, 50, 80))
+    def get_interpolated_camera(self, alpha):
+        """Положение камеры между двумя последними тиками"""
+        previous, current = self.previous_camera_offset, self.camera_offset
+        return (previous[0] + (current[0] - previous[0]) * alpha,
+                previous[1] + (current[1] - previous[1]) * alpha)
+    
+    def to_screen_rect(self, rect, camera_offset=(0, 0)):
+        """Переводит прямоугольник из мировых координат во внутреннее разрешение"""
+        scale = self.render_scale
+        return pygame.Rect((rect[0] - camera_offset[0]) * scale,
+                           (rect[1] - camera_offset[1]) * scale,
+                           rect[2] * scale, rect[3] * scale)
+    
+    def draw(self, alpha=1.0):
+        camera_offset = self.get_interpolated_camera(alpha)
         
-        # Рисуем платформы
-        for platform in self.platforms:
-            draw_rect = platform.move(-self.camera_offset[0], -self.camera_offset[1])
+        # Фон уровня (параллакс - в пикселях внутреннего разрешения)
+        if self.level:
+            self.level.draw_background((camera_offset[0] * self.render_scale,
+                                        camera_offset[1] * self.render_scale))
+        else:
+            self.screen.fill((50, 50, 80))
+        
+        # Рисуем платформы (на большой арене - только попавшие в кадр)
+        if self.arena:
+            view = pygame.Rect(camera_offset[0], camera_offset[1], self.world_width, self.world_height)
+            visible_platforms = self.arena.query(view)
+        else:
+            visible_platforms = self.platforms
+        for platform in visible_platforms:
+            draw_rect = self.to_screen_rect(platform, camera_offset)
             pygame.draw.rect(self.screen, (100, 70, 40), draw_rect)
             pygame.draw.rect(self.screen, (80, 50, 30), draw_rect, 2)
         
+        # Рисуем орду
+        if self.horde:
+            self.horde.draw(camera_offset)
+        
         # Рисуем игроков
         for player in self.players:
-            player.draw(self.camera_offset)
+            player.draw(camera_offset, alpha)
         
         # Рисуем хитбоксы в режиме отладки
         if self.debug_mode:
-            self.draw_debug_hitboxes()
+            self.draw_debug_hitboxes(camera_offset)
         
         # Рисуем HUD
         self.draw_hud()
     
-    def draw_debug_hitboxes(self):
+    def draw_debug_hitboxes(self, camera_offset):
         """Рисует полупрозрачные хитбоксы для отладки"""
         for player in self.players:
             # Хитбокс персонажа (зеленый)
-            char_rect = player.rect.move(-self.camera_offset[0], -self.camera_offset[1])
+            char_rect = self.to_screen_rect(player.rect, camera_offset)
             debug_surface = pygame.Surface((char_rect.width, char_rect.height), pygame.SRCALPHA)
             debug_surface.fill((0, 255, 0, 128))
             self.screen.blit(debug_surface, char_rect)
             
             # Хитбокс атаки (красный)
             if player.actions['attacking']:
-                attack_rect = player.attack_hitbox.move(-self.camera_offset[0], -self.camera_offset[1])
+                attack_rect = self.to_screen_rect(player.attack_hitbox, camera_offset)
                 attack_surface = pygame.Surface((attack_rect.width, attack_rect.height), pygame.SRCALPHA)
                 attack_surface.fill((255, 0, 0, 128))
                 self.screen.blit(attack_surface, attack_rect)
     
     def draw_hud(self):
         """Рисует интерфейс"""
-        font = pygame.font.Font(None, 36)
+        # Разметка HUD задана для логического экрана 1000x600
+        scale = self.render_scale
+        font = self.get_font(max(8, int(36 * scale)))
         
         # Здоровье игрока 1
-        health_text1 = f"P1: {self.players[0].health}/100"
-        text_surf1 = font.render(health_text1, True, (255, 255, 255))
-        self.screen.blit(text_surf1, (20, 20))
+        if font:
+            health_text1 = f"P1: {self.players[0].health}/{self.players[0].rules.health}"
+            text_surf1 = font.render(health_text1, True, (255, 255, 255))
+            self.screen.blit(text_surf1, (20 * scale, 20 * scale))
         
         # Полоска здоровья игрока 1
-        health_width1 = (self.players[0].health / 100) * 200
-        pygame.draw.rect(self.screen, (255, 0, 0), (20, 60, 200, 20))
-        pygame.draw.rect(self.screen, (0, 255, 0), (20, 60, health_width1, 20))
+        health_width1 = (self.players[0].health / self.players[0].rules.health) * 200
+        pygame.draw.rect(self.screen, (255, 0, 0), self.to_screen_rect((20, 60, 200, 20)))
+        pygame.draw.rect(self.screen, (0, 255, 0), self.to_screen_rect((20, 60, health_width1, 20)))
         
         # Здоровье игрока 2  
-        health_text2 = f"P2: {self.players[1].health}/100"
-        text_surf2 = font.render(health_text2, True, (255, 255, 255))
-        self.screen.blit(text_surf2, (780, 20))
+        if font:
+            health_text2 = f"P2: {self.players[1].health}/{self.players[1].rules.health}"
+            text_surf2 = font.render(health_text2, True, (255, 255, 255))
+            self.screen.blit(text_surf2, (780 * scale, 20 * scale))
         
         # Полоска здоровья игрока 2
-        health_width2 = (self.players[1].health / 100) * 200
-        pygame.draw.rect(self.screen, (255, 0, 0), (780, 60, 200, 20))
-        pygame.draw.rect(self.screen, (0, 255, 0), (980 - health_width2, 60, health_width2, 20))
+        health_width2 = (self.players[1].health / self.players[1].rules.health) * 200
+        pygame.draw.rect(self.screen, (255, 0, 0), self.to_screen_rect((780, 60, 200, 20)))
+        pygame.draw.rect(self.screen, (0, 255, 0), self.to_screen_rect((980 - health_width2, 60, health_width2, 20)))
+        
+        # Счетчик орды
+        if self.horde and font:
+            horde_text = f"Horde: {self.horde.alive_count}"
+            horde_surf = font.render(horde_text, True, (255, 150, 150))
+            self.screen.blit(horde_surf, (430 * scale, 20 * scale))
         
         # Индикатор режима отладки
-        if self.debug_mode:
+        if self.debug_mode and font:
             debug_text = "DEBUG MODE: HITBOXES VISIBLE (Press I to hide)"
             debug_surf = font.render(debug_text, True, (255, 255, 0))
-            self.screen.blit(debug_surf, (250, 550))
\ No newline at end of file
+            self.screen.blit(debug_surf, (250 * scale, 550 * scale))
+            self.draw_texture_stats()
+    
+    def draw_texture_stats(self):
+        """Память под кадры анимаций: всего, по типам сущностей, вытеснения"""
+        scale = self.render_scale
+        font = self.get_font(max(8, int(24 * scale)))
+        textures = self.texture_manager
+        megabyte = 1024 * 1024
+        
+        lines = [f"Textures: {textures.total_bytes / megabyte:.1f}/"
+                 f"{textures.budget_bytes / megabyte:.1f} MB "
+                 f"(evicted {textures.evictions}, reloaded {textures.reloads})"]
+        for entity_type, size in sorted(textures.usage_by_entity().items()):
+            lines.append(f"  {entity_type}: {size / megabyte:.2f} MB")
+        lines.append(f"Hit masks: {textures.mask_bytes / megabyte:.2f} MB")
+        
+        for i, line in enumerate(lines):
+            surf = font.render(line, True, (255, 255, 0))
+            self.screen.blit(surf, (20 * scale, (100 + i * 20) * scale))
\ No newline at end of file
@@ -0,0 +1,196 @@
+import pygame
+import os
+import numpy as np
+from creature import Creature
+import telemetry
+from telemetry import Telemetry
+
+class Horde:
+    """Орда существ в виде структуры массивов (NumPy) с пакетной физикой.
+
+    Параметры (гравитация, скорость, размер, анимация) берутся из шаблонного
+    Creature, а состояние тысяч существ лежит в плоских массивах - за тик
+    нет ни одного цикла по отдельным существам.
+    """
+
+    def __init__(self, screen, assets_path, capacity=5000, asset_cache=None, render_scale=1.0,
+                 texture_manager=None, attackers=2, match_log=None):
+        self.screen = screen
+        self.telemetry = match_log or Telemetry(None)
+        self.capacity = capacity
+        self.render_scale = render_scale
+        self.texture_manager = texture_manager
+
+        # Шаблон с параметрами одного существа
+        self.template = Creature(0, 0, screen)
+        self.width = self.template.rect.width
+        self.height = self.template.rect.height
+
+        # Структура массивов
+        self.position = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.health = np.zeros(capacity, dtype=np.float32)
+        self.animation_frame = np.zeros(capacity, dtype=np.float32)
+        self.on_ground = np.zeros(capacity, dtype=bool)
+        self.facing_right = np.ones(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+        # Номер последнего замаха каждого атакующего, задевшего существо:
+        # один удар ранит существо один раз, а не каждый тик активного окна
+        self.last_swing = np.full((capacity, attackers), -1, dtype=np.int64)
+
+        self.rng = np.random.default_rng()
+        self.load_frames(assets_path, asset_cache)
+
+    def load_frames(self, assets_path, asset_cache):
+        """Кадры ходьбы в размере существа плюс отраженные варианты"""
+        size = (int(self.width * self.render_scale), int(self.height * self.render_scale))
+        folder = os.path.join(assets_path, 'player', 'walk')
+        frames = []
+
+        if asset_cache and os.path.exists(folder):
+            for filename in sorted(os.listdir(folder)):
+                if filename.lower().endswith(('.png', '.jpg', '.jpeg')):
+                    try:
+                        frames.append(asset_cache.load_image(os.path.join(folder, filename), size,
+                                                             remember=False))
+                    except Exception as e:
+                        self.telemetry.record(telemetry.ERROR, f"horde:{filename}", str(e))
+
+        if not frames:
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            surf.fill((150, 40, 40))
+            frames = [surf]
+
+        self.template.animations['walk'] = frames
+        self.template.current_animation = 'walk'
+        # RLE-копии: тысячи мелких альфа-блитов за кадр идут заметно быстрее
+        self.frames_left = [self.make_rle(frame) for frame in frames]
+        self.frames_right = [self.make_rle(pygame.transform.flip(frame, True, False))
+                             for frame in frames]
+
+        # Кадры орды нужны всегда - учитываем их как закрепленные
+        self.texture_keys = [('creature', 'walk_left', size), ('creature', 'walk_right', size)]
+        if self.texture_manager:
+            self.texture_manager.track(self.texture_keys[0], self.frames_left)
+            self.texture_manager.track(self.texture_keys[1], self.frames_right)
+
+    def release(self):
+        """Снимает кадры орды с учета при выключении режима"""
+        if self.texture_manager:
+            for key in self.texture_keys:
+                self.texture_manager.remove(key)
+
+    def make_rle(self, frame):
+        frame = frame.copy()
+        frame.set_alpha(255, pygame.RLEACCEL)
+        return frame
+
+    @property
+    def alive_count(self):
+        return int(np.count_nonzero(self.alive))
+
+    def spawn(self, count, min_x, max_x, y):
+        """Оживляет до count существ в свободных слотах"""
+        free = np.flatnonzero(~self.alive)[:count]
+        if free.size == 0:
+            return 0
+
+        self.position[free, 0] = self.rng.uniform(min_x, max_x - self.width, free.size)
+        self.position[free, 1] = y
+        self.velocity[free] = 0
+        self.health[free] = self.template.health
+        self.animation_frame[free] = self.rng.uniform(0, len(self.frames_left), free.size)
+        self.on_ground[free] = False
+        self.last_swing[free] = -1
+        self.alive[free] = True
+        return free.size
+
+    def update(self, platforms, targets_x, kill_y, dt=1.0):
+        """Пакетный тик: движение к цели, гравитация, интегрирование, приземление"""
+        alive = self.alive
+        x = self.position[:, 0]
+        y = self.position[:, 1]
+        vx = self.velocity[:, 0]
+        vy = self.velocity[:, 1]
+
+        # Идем к ближайшей по X цели
+        centers = x + self.width / 2
+        targets = np.asarray(targets_x, dtype=np.float32)
+        nearest = targets[np.abs(centers[:, None] - targets[None, :]).argmin(axis=1)]
+        direction = np.sign(nearest - centers)
+        vx[:] = direction * self.template.speed
+        self.facing_right[:] = direction > 0
+
+        # Гравитация для тех, кто в воздухе
+        vy += np.where(self.on_ground, 0.0, self.template.gravity * dt).astype(np.float32)
+
+        previous_bottom = y + self.height
+        x += vx * dt
+        y += vy * dt
+        bottom = y + self.height
+
+        # Приземление: пересекли верх платформы сверху вниз за этот шаг
+        self.on_ground[:] = False
+        for platform in platforms:
+            landed = (alive & (vy >= 0) &
+                      (x + self.width > platform.left) & (x < platform.right) &
+                      (previous_bottom <= platform.top) & (bottom >= platform.top))
+            y[landed] = platform.top - self.height
+            vy[landed] = 0
+            self.on_ground |= landed
+
+        # Упавшие за пределы мира исчезают
+        self.alive &= y < kill_y
+
+        # Анимация ходьбы
+        self.animation_frame += self.template.animation_speed * dt
+        self.animation_frame %= len(self.frames_left)
+
+    def hit(self, rect, damage, attacker, swing):
+        """Урон существам, пересекающим rect и еще не задетым этим замахом.
+
+        attacker - индекс атакующего, swing - номер его замаха; возвращает
+        число попаданий.
+        """
+        x = self.position[:, 0]
+        y = self.position[:, 1]
+        swings = self.last_swing[:, attacker]
+        hits = (self.alive & (swings != swing) &
+                (x + self.width > rect.left) & (x < rect.right) &
+                (y + self.height > rect.top) & (y < rect.bottom))
+        swings[hits] = swing
+        self.health[hits] -= damage
+        self.alive &= self.health > 0
+        return int(np.count_nonzero(hits))
+
+    def touches(self, rect):
+        """Есть ли живые существа, касающиеся rect"""
+        x = self.position[:, 0]
+        y = self.position[:, 1]
+        return bool(np.any(self.alive &
+                           (x + self.width > rect.left) & (x < rect.right) &
+                           (y + self.height > rect.top) & (y < rect.bottom)))
+
+    def draw(self, camera_offset):
+        """Рисует только видимых существ одним вызовом blits"""
+        scale = self.render_scale
+        screen_x = (self.position[:, 0] - camera_offset[0]) * scale
+        screen_y = (self.position[:, 1] - camera_offset[1]) * scale
+        screen_width, screen_height = self.screen.get_size()
+
+        visible = np.flatnonzero(self.alive &
+                                 (screen_x > -self.width * scale) & (screen_x < screen_width) &
+                                 (screen_y > -self.height * scale) & (screen_y < screen_height))
+        if visible.size == 0:
+            return
+
+        frames = self.animation_frame[visible].astype(np.int32)
+        facing = self.facing_right[visible]
+        xs = screen_x[visible].astype(np.int32).tolist()
+        ys = screen_y[visible].astype(np.int32).tolist()
+        frames_left, frames_right = self.frames_left, self.frames_right
+
+        self.screen.blits([
+            ((frames_right if right else frames_left)[frame], (sx, sy))
+            for frame, right, sx, sy in zip(frames.tolist(), facing.tolist(), xs, ys)
+        ], False)
@@ -0,0 +1,101 @@
+import pygame
+
+# Раскладка геймпада по умолчанию (кнопки в стиле Xbox: A, B, X, Y)
+DEFAULT_GAMEPAD_CONTROLS = {
+    'jump': 0,
+    'block': 1,
+    'attack': 2,
+    'heavy_attack': 3
+}
+
+# Мертвая зона стика для движения влево/вправо
+AXIS_DEADZONE = 0.5
+
+# Действия, которые срабатывают по нажатию; движение опрашивается раз в тик
+MOVEMENT_ACTIONS = ('left', 'right')
+
+class InputRouter:
+    """Единая таблица клавиша -> (игрок, действие) для всех локальных игроков"""
+
+    def __init__(self, players, gamepad_controls=None):
+        self.players = players
+        self.gamepad_controls = dict(gamepad_controls or DEFAULT_GAMEPAD_CONTROLS)
+
+        self.key_bindings = {}
+        self.button_bindings = {}
+        self.movement_keys = ()
+
+        # Подключенные геймпады: instance_id -> (джойстик, игрок)
+        self.gamepads = {}
+
+        self.compile()
+
+    def compile(self):
+        """Собирает controls всех игроков в словари для поиска за O(1)"""
+        self.key_bindings = {}
+        movement_keys = []
+
+        for player in self.players:
+            for action, key in player.controls.items():
+                if action in MOVEMENT_ACTIONS:
+                    continue
+                self.key_bindings.setdefault(key, []).append((player, action))
+            movement_keys.append((player, player.controls['left'], player.controls['right']))
+
+        self.movement_keys = tuple(movement_keys)
+        self.button_bindings = {button: action for action, button in self.gamepad_controls.items()}
+
+    def remap(self, player, action, key):
+        """Переназначает клавишу действия игрока"""
+        player.controls[action] = key
+        self.compile()
+
+    def remap_gamepad(self, action, button):
+        """Переназначает кнопку геймпада для действия"""
+        self.gamepad_controls[action] = button
+        self.compile()
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN or event.type == pygame.KEYUP:
+            bindings = self.key_bindings.get(event.key)
+            if bindings:
+                pressed = event.type == pygame.KEYDOWN
+                for player, action in bindings:
+                    player.handle_action(action, pressed)
+
+        elif event.type == pygame.JOYBUTTONDOWN or event.type == pygame.JOYBUTTONUP:
+            gamepad = self.gamepads.get(event.instance_id)
+            action = self.button_bindings.get(event.button)
+            if gamepad and action:
+                gamepad[1].handle_action(action, event.type == pygame.JOYBUTTONDOWN)
+
+        elif event.type == pygame.JOYDEVICEADDED:
+            self.add_gamepad(event.device_index)
+
+        elif event.type == pygame.JOYDEVICEREMOVED:
+            self.gamepads.pop(event.instance_id, None)
+
+    def add_gamepad(self, device_index):
+        """Отдает новый геймпад первому игроку без геймпада"""
+        taken = [player for _, player in self.gamepads.values()]
+        for player in self.players:
+            if player not in taken:
+                joystick = pygame.joystick.Joystick(device_index)
+                self.gamepads[joystick.get_instance_id()] = (joystick, player)
+                return
+
+    def sample(self):
+        """Один опрос клавиатуры и геймпадов за тик для всех игроков"""
+        keys = pygame.key.get_pressed()
+        for player, left_key, right_key in self.movement_keys:
+            player.input_left = keys[left_key]
+            player.input_right = keys[right_key]
+
+        for joystick, player in self.gamepads.values():
+            direction = joystick.get_axis(0) if joystick.get_numaxes() else 0
+            if joystick.get_numhats():
+                direction += joystick.get_hat(0)[0]
+            if direction <= -AXIS_DEADZONE:
+                player.input_left = True
+            elif direction >= AXIS_DEADZONE:
+                player.input_right = True
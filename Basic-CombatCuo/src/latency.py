@@ -0,0 +1,151 @@
+import os
+import sys
+import time
+import random
+import threading
+from array import array
+from collections import deque
+
+import pygame
+
+# События, задержку которых до экрана мы меряем
+INPUT_EVENT_TYPES = (pygame.KEYDOWN, pygame.KEYUP, pygame.JOYBUTTONDOWN,
+                     pygame.JOYBUTTONUP, pygame.JOYHATMOTION)
+
+class LatencyTracker:
+    """Задержка от события ввода до flip кадра, в котором оно уже учтено.
+
+    У событий pygame нет собственного времени, поэтому событие
+    помечается моментом, когда его забрали из очереди (нижняя оценка:
+    ожидание в очереди ОС не входит). Событие с атрибутом sent_time
+    (так их шлет benchmark_pacing) меряется от него - точно.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.samples = array('d', bytes(8 * capacity))
+        self.count = 0
+        # Время событий, которые уже обработаны, но еще не показаны
+        self.pending = array('d')
+
+    def stamp(self, event, now):
+        if event.type in INPUT_EVENT_TYPES:
+            self.pending.append(getattr(event, 'sent_time', now))
+
+    def presented(self, flip_time):
+        samples = self.samples
+        for event_time in self.pending:
+            samples[self.count % self.capacity] = flip_time - event_time
+            self.count += 1
+        del self.pending[:]
+
+    def percentiles(self, points=(50, 90, 99)):
+        """Перцентили задержки в мс по последним capacity событиям"""
+        size = min(self.count, self.capacity)
+        if not size:
+            return {point: 0.0 for point in points}
+        values = sorted(self.samples[:size])
+        return {point: values[min(size - 1, size * point // 100)] * 1000.0 for point in points}
+
+    def report(self):
+        p = self.percentiles()
+        return (f"ввод -> кадр: p50 {p[50]:.1f} мс, p90 {p[90]:.1f} мс, "
+                f"p99 {p[99]:.1f} мс ({min(self.count, self.capacity)} событий)")
+
+def sleep_until(deadline, spin_time=0.002):
+    """Спит до deadline; последние spin_time досыпаем в цикле - sleep() неточен"""
+    remaining = deadline - time.perf_counter()
+    if remaining > spin_time:
+        time.sleep(remaining - spin_time)
+    while time.perf_counter() < deadline:
+        pass
+
+class LateLatchPacer:
+    """Темп кадров "сначала сон": ввод читается как можно позже перед flip.
+
+    Обычный цикл читает ввод сразу после сна и показывает кадр через
+    время работы кадра - при flip по вертикальной синхронизации событие
+    ждет почти целый лишний кадр. Здесь сон идет до (следующий flip -
+    ожидаемая работа кадра), а работа (без ожидания в flip) оценивается
+    по максимуму последних кадров с небольшим запасом.
+    """
+
+    def __init__(self, frame_time, margin=0.001, history=30):
+        self.frame_time = frame_time
+        self.margin = margin
+        self.work_times = deque([frame_time / 2], maxlen=history)
+        self.next_flip = time.perf_counter() + frame_time
+
+    def wait(self):
+        """Спит до момента чтения ввода; возвращает время пробуждения"""
+        sleep_until(self.next_flip - max(self.work_times) - self.margin)
+        return time.perf_counter()
+
+    def presented(self, sample_time, render_time, flip_time):
+        self.work_times.append(render_time - sample_time)
+        # С вертикальной синхронизацией flip возвращается сразу после
+        # обновления дисплея - от него и отсчитываем следующий кадр
+        self.next_flip = flip_time + self.frame_time
+
+def benchmark_pacing(duration=5.0, refresh_rate=60, work_time=0.004):
+    """Безголовое сравнение темпа кадров: задержка ввод -> кадр на экране.
+
+    flip эмулирует вертикальную синхронизацию (кадр уходит на экран на
+    ближайшем обновлении дисплея), а ввод приходит из отдельного потока
+    в случайные моменты и несет точное время отправки.
+    """
+    from headless import init_headless
+    init_headless()
+    from main import Game
+
+    refresh_time = 1.0 / refresh_rate
+
+    class EmulatedDisplayGame(Game):
+        def render(self, alpha):
+            # Тяжелая сцена: добавляем работы кадру
+            super().render(alpha)
+            sleep_until(time.perf_counter() + work_time)
+
+        def present(self):
+            # flip ждет ближайшего обновления дисплея
+            now = time.perf_counter()
+            sleep_until(now + refresh_time - now % refresh_time)
+            return super().present()
+
+    print("=== ЗАДЕРЖКА ВВОДА ===")
+    results = {}
+    for mode in ('classic', 'late_latch'):
+        # У эмулированного дисплея драйвер частоту не сообщает
+        game = EmulatedDisplayGame(FRAME_PACING=mode, FALLBACK_REFRESH_RATE=refresh_rate)
+        game.MAX_RENDER_FPS = refresh_rate
+
+        def feed():
+            rng = random.Random(0)
+            end = time.perf_counter() + duration
+            pressed = False
+            while time.perf_counter() < end:
+                time.sleep(rng.uniform(0.02, 0.08))
+                pressed = not pressed
+                event_type = pygame.KEYDOWN if pressed else pygame.KEYUP
+                pygame.event.post(pygame.event.Event(event_type, key=pygame.K_a,
+                                                     sent_time=time.perf_counter()))
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        feeder.start()
+        try:
+            game.run()
+        except SystemExit:
+            pass
+        feeder.join()
+        results[mode] = game.latency.percentiles()
+        print(f"{mode}: {game.latency.report()}")
+
+    saved = results['classic'][50] - results['late_latch'][50]
+    print(f"Медиана короче на {saved:.1f} мс")
+    print("======================")
+    return results
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    benchmark_pacing()
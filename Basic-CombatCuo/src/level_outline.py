@@ -1,46 +1,69 @@
 import pygame
 import os
+from asset_cache import AssetCache
+from backgrounds import PARALLAX_LAYERS, make_gradient, make_parallax_layer
+import navigation
+import telemetry
 
 class Level:
-    def __init__(self, screen, assets_path):
+    def __init__(self, screen, assets_path, asset_cache=None, level_number=1, world_size=None):
         self.screen = screen
+        # Платформы и граф навигации - в координатах мира, фон - в пикселях экрана
+        self.world_size = world_size or screen.get_size()
+        self.render_scale = screen.get_width() / self.world_size[0]
         self.assets_path = assets_path
+        self.asset_cache = asset_cache or AssetCache(assets_path)
+        self.level_number = level_number
         self.platforms = []
         
+        self.parallax_layers = []
         self.load_background()
         self.generate_level()
     
     def load_background(self):
-        """Загружает фоновое изображение"""
-        background_path = os.path.join(self.assets_path, "backgrounds", "level1.jpg")
+        """Загружает фоновое изображение (декодированный вариант берется из кэша)"""
+        background_path = os.path.join(self.assets_path, "backgrounds",
+                                       f"level{self.level_number}.jpg")
         
         try:
             if os.path.exists(background_path):
-                self.background = pygame.image.load(background_path).convert()
-                self.background = pygame.transform.scale(self.background, 
-                                                       self.screen.get_size())
+                self.background = self.asset_cache.load_image(
+                    background_path, self.screen.get_size(), alpha=False)
             else:
                 self.create_gradient_background()
         except Exception as e:
-            print(f"Ошибка загрузки фона: {e}")
+            self.asset_cache.match_log.record(telemetry.ERROR, f"background:{background_path}", str(e))
             self.create_gradient_background()
     
     def create_gradient_background(self):
-        """Создает градиентный фон-заглушку"""
-        self.background = pygame.Surface(self.screen.get_size())
-        for y in range(self.screen.get_height()):
-            # Градиент от синего к светлому
-            color = (100, 150, max(50, 255 - y // 4))
-            pygame.draw.line(self.background, color, (0, y), (self.screen.get_width(), y))
+        """Создает градиентный фон-заглушку с процедурными слоями параллакса"""
+        size = self.screen.get_size()
+        self.background = self.asset_cache.load_generated(
+            'gradient', (), size, lambda: make_gradient(size))
+        self.load_parallax_layers()
+    
+    def load_parallax_layers(self):
+        """Процедурные слои параллакса, зависят только от номера уровня и разрешения"""
+        size = self.screen.get_size()
+        self.parallax_layers = []
+        
+        for index, (color, base, amplitude, factor) in enumerate(PARALLAX_LAYERS):
+            seed = self.level_number * 100 + index
+            params = (seed, color, base, amplitude)
+            layer = self.asset_cache.load_generated(
+                'parallax', params, size,
+                lambda: make_parallax_layer(size, seed, color, base, amplitude),
+                alpha=True)
+            self.parallax_layers.append((layer, factor))
     
     def generate_level(self):
         """Генерирует уровень с платформами"""
-        screen_width, screen_height = self.screen.get_size()
+        world_width, world_height = self.world_size
         
         # Основные платформы
         level_data = [
             # Земля
-            (0, screen_height - 100, screen_width * 3, 100),
+            (0, world_height - 100, world_width * 3, 100),
             # Платформы (x, y, width, height)
             (300, 400, 200, 20),
             (600, 300, 150, 20),
@@ -52,13 +75,30 @@ class Level:
         for x, y, width, height in level_data:
             self.platforms.append(pygame.Rect(x, y, width, height))
     
+    def get_nav_graph(self, entity):
+        """Граф переходов между платформами уровня для движения как у entity"""
+        return navigation.get_nav_graph(self.platforms, navigation.agent_profile(entity))
+    
+    def draw_background(self, camera_offset):
+        """Фон и слои параллакса; camera_offset - в пикселях экрана"""
+        self.screen.blit(self.background, (0, 0))
+        
+        # Слои параллакса тайлятся по горизонтали
+        for layer, factor in self.parallax_layers:
+            width = layer.get_width()
+            offset_x = -int(camera_offset[0] * factor) % width
+            self.screen.blit(layer, (offset_x - width, 0))
+            self.screen.blit(layer, (offset_x, 0))
+    
     def draw(self, camera_offset):
         """Отрисовывает уровень"""
-        # Фон
-        self.screen.blit(self.background, (0, 0))
+        self.draw_background(camera_offset)
         
-        # Платформы
+        # Платформы (мир -> пиксели экрана)
+        scale = self.render_scale
         for platform in self.platforms:
-            draw_rect = platform.move(-camera_offset[0], -camera_offset[1])
+            draw_rect = pygame.Rect(round(platform.x * scale - camera_offset[0]),
+                                    round(platform.y * scale - camera_offset[1]),
+                                    round(platform.width * scale), round(platform.height * scale))
             pygame.draw.rect(self.screen, (139, 69, 19), draw_rect)  # Коричневый
             pygame.draw.rect(self.screen, (101, 67, 33), draw_rect, 2)  # Контур
\ No newline at end of file
@@ -1,23 +1,106 @@
+import startup_trace
+# Трассировку включаем до остальных импортов, чтобы замерить и их
+startup_trace.enable_from_environment()
 import pygame
 import sys
 import os
+import time
+import argparse
+import telemetry
+from latency import LatencyTracker, LateLatchPacer
+from startup_trace import trace
 
 class Game:
-    def __init__(self):
+    # Режимы запуска: значения по умолчанию; меняются без правки кода -
+    # аргументами Game(NAME=значение) или из командной строки (parse_args)
+    # Внутреннее разрешение отрисовки относительно логического экрана
+    # (0.5 - рисуем в половинном разрешении и растягиваем на окно)
+    RENDER_SCALE = 1.0
+    # Где идет симуляция: None - в цикле отрисовки, 'thread' - в отдельном
+    # потоке, 'process' - в отдельном процессе (обмен через общую память)
+    SIMULATION_MODE = None
+    # Порт трансляции матча зрителям (python spectator.py host port); None - выключено
+    SPECTATOR_PORT = None
+    # Адрес, на котором слушает трансляция; по умолчанию - только эта машина,
+    # '0.0.0.0' открывает матч всей сети
+    SPECTATOR_HOST = '127.0.0.1'
+    # Темп кадров: 'classic' - сон в clock.tick, затем ввод и кадр;
+    # 'late_latch' - сон до последнего момента перед flip, ввод читается
+    # как можно позже (меньше задержка ввода, особенно с VSYNC)
+    FRAME_PACING = 'classic'
+    VSYNC = False
+    # Частота дисплея, если драйвер ее не сообщает (late_latch подстраивается под flip)
+    FALLBACK_REFRESH_RATE = 60
+    # Номер уровня (фон); N в игре - следующий
+    LEVEL = 1
+    # Звук (микшер, декодирование, музыка) и шрифты HUD - после первого кадра
+    DEFERRED_INIT = False
+    
+    def __init__(self, **options):
+        for name, value in options.items():
+            if not name.isupper() or not hasattr(Game, name):
+                raise TypeError(f"неизвестная настройка Game: {name}")
+            setattr(self, name, value)
+        
         self.SCREEN_WIDTH = 1000
         self.SCREEN_HEIGHT = 600
-        self.FPS = 60
+        # Размер окна; картинка растягивается на него одним transform.scale
+        self.WINDOW_SIZE = (self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
+        # Симуляция идет с фиксированной частотой, отрисовка - так часто,
+        # как позволяет дисплей (с верхним пределом, чтобы не грузить CPU впустую)
+        self.TICK_RATE = 60
+        self.TICK_TIME = 1.0 / self.TICK_RATE
+        self.MAX_RENDER_FPS = 240
+        # Защита от "спирали смерти": не больше N тиков за кадр
+        self.MAX_UPDATES_PER_FRAME = 5
+        self.accumulator = 0.0
+        # Кадр дольше двух тиков пишется в журнал как перегрузка
+        self.FRAME_OVERRUN_TIME = self.TICK_TIME * 2
+        self.spectator_server = None
+        # Задержка от события ввода до показа кадра
+        self.latency = LatencyTracker()
+        self.first_frame_shown = False
         
-        self.init_pygame()
-        self.setup_paths()
-        self.create_game_objects()
+        with trace.span('init_pygame'):
+            self.init_pygame()
+        with trace.span('setup_paths'):
+            self.setup_paths()
+        with trace.span('create_game_objects'):
+            self.create_game_objects()
     
     def init_pygame(self):
-        pygame.init()
-        self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
-        pygame.display.set_caption("2D Fighter - Sword vs Spear")
+        with trace.span('pygame.init'):
+            if self.DEFERRED_INIT:
+                # Без микшера: открытие аудиоустройства - одна из самых долгих частей запуска
+                pygame.display.init()
+                pygame.font.init()
+                # Геймпады InputRouter
+                pygame.joystick.init()
+            else:
+                pygame.init()
+        with trace.span('set_mode'):
+            self.create_window()
+        
+        render_size = (int(self.SCREEN_WIDTH * self.RENDER_SCALE),
+                       int(self.SCREEN_HEIGHT * self.RENDER_SCALE))
+        if render_size == self.WINDOW_SIZE:
+            # Размеры совпадают - рисуем прямо в окно, без лишнего копирования
+            self.screen = self.window
+        else:
+            self.screen = pygame.Surface(render_size).convert()
         self.clock = pygame.time.Clock()
     
+    def create_window(self):
+        self.window = None
+        if self.VSYNC:
+            try:
+                self.window = pygame.display.set_mode(self.WINDOW_SIZE, pygame.SCALED, vsync=1)
+            except pygame.error:
+                pass  # синхронизация недоступна - обычное окно
+        if self.window is None:
+            self.window = pygame.display.set_mode(self.WINDOW_SIZE)
+        pygame.display.set_caption("2D Fighter - Sword vs Spear")
+    
     def setup_paths(self):
         project_path = r"C:\Users\student\Desktop\Basic-CombatCuo"
         if os.path.exists(project_path):
@@ -26,27 +109,190 @@ class Game:
     
     def create_game_objects(self):
         from game_manager import GameManager
-        self.game_manager = GameManager(self.screen, self.assets_path)
+        if self.SIMULATION_MODE:
+            # Симуляцию ведет свой GameManager; этот только хранит снимок и рисует его
+            self.game_manager = GameManager(self.screen, self.assets_path, self.RENDER_SCALE,
+                                            match_log=telemetry.Telemetry(None), local_input=False,
+                                            deferred_init=self.DEFERRED_INIT, level_number=self.LEVEL)
+        else:
+            self.game_manager = GameManager(self.screen, self.assets_path, self.RENDER_SCALE,
+                                            deferred_init=self.DEFERRED_INIT, level_number=self.LEVEL)
+            if self.SPECTATOR_PORT is not None:
+                from spectator import SpectatorServer
+                self.spectator_server = SpectatorServer(self.game_manager, self.SPECTATOR_HOST,
+                                                        self.SPECTATOR_PORT)
     
     def handle_events(self):
+        now = time.perf_counter()
         for event in pygame.event.get():
+            self.latency.stamp(event, now)
             if event.type == pygame.QUIT:
                 return False
             self.game_manager.handle_event(event)
         return True
     
+    def step_simulation(self, frame_time):
+        """Прогоняет накопленные фиксированные тики, возвращает долю до следующего"""
+        self.accumulator += frame_time
+        
+        # Если кадр был слишком долгим - отбрасываем лишнее время, а не догоняем
+        max_accumulated = self.TICK_TIME * self.MAX_UPDATES_PER_FRAME
+        if self.accumulator > max_accumulated:
+            self.accumulator = max_accumulated
+        
+        while self.accumulator >= self.TICK_TIME:
+            self.game_manager.update()
+            if self.spectator_server:
+                self.spectator_server.publish()
+            self.accumulator -= self.TICK_TIME
+        
+        return self.accumulator / self.TICK_TIME
+    
+    def render(self, alpha):
+        self.game_manager.draw(alpha)
+    
+    def present(self):
+        """Растягивает внутренний кадр на окно и показывает его"""
+        if self.screen is not self.window:
+            pygame.transform.scale(self.screen, self.WINDOW_SIZE, self.window)
+        pygame.display.flip()
+        flip_time = time.perf_counter()
+        self.latency.presented(flip_time)
+        if not self.first_frame_shown:
+            self.first_frame_shown = True
+            self.on_first_frame()
+        return flip_time
+    
+    def on_first_frame(self):
+        """Первый кадр на экране: отчет о запуске и отложенная инициализация"""
+        trace.first_frame()
+        if trace.enabled:
+            print(trace.report())
+        if self.DEFERRED_INIT:
+            self.game_manager.finish_deferred_init()
+    
+    def get_refresh_period(self):
+        """Период обновления дисплея, на котором открыто окно (в секундах)"""
+        # get_current_refresh_rate есть только в pygame-ce; 0 - частота неизвестна
+        get_refresh_rate = getattr(pygame.display, 'get_current_refresh_rate', None)
+        refresh_rate = 0
+        if get_refresh_rate:
+            try:
+                refresh_rate = get_refresh_rate()
+            except pygame.error:
+                pass
+        return 1.0 / (refresh_rate if refresh_rate > 0 else self.FALLBACK_REFRESH_RATE)
+    
     def run(self):
+        if self.SIMULATION_MODE:
+            self.run_split()
+            return
+        
         running = True
+        if self.FRAME_PACING == 'late_latch':
+            pacer = LateLatchPacer(self.get_refresh_period())
+            last_sample = time.perf_counter()
         while running:
+            if self.FRAME_PACING == 'late_latch':
+                sample_time = pacer.wait()
+                frame_time = sample_time - last_sample
+                last_sample = sample_time
+            else:
+                frame_time = self.clock.tick(self.MAX_RENDER_FPS) / 1000.0
+            if frame_time > self.FRAME_OVERRUN_TIME:
+                self.game_manager.telemetry.record(telemetry.FRAME_OVERRUN, frame_time * 1000.0)
             running = self.handle_events()
-            self.game_manager.update()
-            self.game_manager.draw()
-            pygame.display.flip()
-            self.clock.tick(self.FPS)
+            alpha = self.step_simulation(frame_time)
+            self.render(alpha)
+            if self.FRAME_PACING == 'late_latch':
+                render_time = time.perf_counter()
+                pacer.presented(sample_time, render_time, self.present())
+            else:
+                self.present()
+        
+        self.record_latency()
+        if self.spectator_server:
+            self.spectator_server.close()
+        self.game_manager.close()
+        pygame.quit()
+        sys.exit()
+    
+    def record_latency(self):
+        percentiles = self.latency.percentiles()
+        self.game_manager.telemetry.record(
+            telemetry.INPUT_LATENCY, self.FRAME_PACING, min(self.latency.count, self.latency.capacity),
+            percentiles[50], percentiles[90], percentiles[99])
+
+    def run_split(self):
+        """Отрисовка отдельно от симуляции: рисуем последний опубликованный снимок"""
+        from input_router import InputRouter
+        from sim_split import SimulationWorker, RemoteControls, apply_snapshot, SOUND_NAMES
+        
+        view = self.game_manager
+        animation_names = list(view.players[0].animation_folders)
         
+        worker = SimulationWorker(self.SIMULATION_MODE, self.assets_path, self.TICK_RATE)
+        remotes = [RemoteControls(i, player.controls, worker.commands)
+                   for i, player in enumerate(view.players)]
+        router = InputRouter(remotes)
+        worker.start()
+        
+        sound_counts = [0] * len(SOUND_NAMES)
+        running = True
+        while running:
+            self.clock.tick(self.MAX_RENDER_FPS)
+            now = time.perf_counter()
+            for event in pygame.event.get():
+                self.latency.stamp(event, now)
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_i:
+                    view.handle_event(event)
+                router.handle_event(event)
+            router.sample()
+            for remote in remotes:
+                remote.flush_movement()
+            
+            snapshot = worker.buffer.read()
+            if snapshot is None:
+                continue
+            apply_snapshot(view, snapshot, animation_names)
+            
+            # Звуки, сыгранные симуляцией с прошлого кадра
+            for i, name in enumerate(SOUND_NAMES):
+                count = int(snapshot[6 + i])
+                if count > sound_counts[i]:
+                    sound_counts[i] = count
+                    view.play_sound(name)
+            
+            # Доля тика, прошедшая с публикации снимка
+            alpha = min(1.0, (time.perf_counter() - snapshot[0]) / self.TICK_TIME)
+            view.draw(alpha)
+            self.present()
+        
+        worker.stop()
+        view.close()
         pygame.quit()
         sys.exit()
 
+def parse_args(argv=None):
+    """Режимы запуска из командной строки: {имя настройки Game: значение}"""
+    parser = argparse.ArgumentParser(description="2D Fighter - Sword vs Spear")
+    parser.add_argument('--render-scale', dest='RENDER_SCALE', type=float)
+    parser.add_argument('--simulation', dest='SIMULATION_MODE', choices=('thread', 'process'))
+    parser.add_argument('--spectator-port', dest='SPECTATOR_PORT', type=int)
+    parser.add_argument('--spectator-host', dest='SPECTATOR_HOST')
+    parser.add_argument('--pacing', dest='FRAME_PACING', choices=('classic', 'late_latch'))
+    parser.add_argument('--vsync', dest='VSYNC', action='store_const', const=True)
+    parser.add_argument('--refresh-rate', dest='FALLBACK_REFRESH_RATE', type=float)
+    parser.add_argument('--level', dest='LEVEL', type=int)
+    parser.add_argument('--deferred-init', dest='DEFERRED_INIT', action='store_const', const=True)
+    # Трассировку запуска включает startup_trace.enable_from_environment
+    parser.add_argument('--trace', action='store_true')
+    args = parser.parse_args(argv)
+    return {name: value for name, value in vars(args).items()
+            if name.isupper() and value is not None}
+
 if __name__ == "__main__":
-    game = Game()
+    game = Game(**parse_args())
     game.run()
\ No newline at end of file
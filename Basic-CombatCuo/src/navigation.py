@@ -0,0 +1,287 @@
+import heapq
+import pygame
+from collision import sweep_platforms, merge_platform_spans
+
+# Ноги персонажа уже хитбокса - так проверяет землю Player.handle_collisions
+FOOT_INSET = 8
+# Ниже этой глубины падение не просчитываем
+MAX_FALL_DEPTH = 2000
+JUMP = 'jump'
+DROP = 'drop'
+WALK = 'walk'
+
+def agent_profile(entity):
+    """Параметры движения сущности: размеры, скорость, гравитация, сила прыжка.
+
+    У существ без прыжка (Creature) jump_power считается нулевым -
+    им доступны только спуски.
+    """
+    return (entity.rect.width, entity.rect.height, entity.speed,
+            entity.gravity, getattr(entity, 'jump_power', 0))
+
+def flight_heights(start_velocity, gravity):
+    """Высота ног над точкой отрыва после каждого тика полета.
+
+    Интегрирует так же, как Player.apply_physics: сначала скорость
+    получает гравитацию, затем персонаж сдвигается на нее.
+    """
+    if gravity <= 0:
+        raise ValueError(f"полет не кончается при gravity={gravity}")
+    heights = [0.0]
+    height = 0.0
+    velocity = start_velocity
+    while height > -MAX_FALL_DEPTH:
+        velocity += gravity
+        height -= velocity
+        heights.append(height)
+    return heights
+
+def last_tick_above(heights, rise):
+    """Последний тик, когда ноги еще не ниже rise; None - высота недостижима"""
+    if max(heights) < rise:
+        return None
+    for tick in range(len(heights) - 1, -1, -1):
+        if heights[tick] >= rise:
+            return tick
+    return None
+
+class NavGraph:
+    """Граф переходов между отрезками платформ для поиска пути A*.
+
+    Узлы - отрезки, по которым можно ходить; ребра - прыжки и спуски,
+    которые реально выполнимы с данными скоростью, гравитацией и силой
+    прыжка. Каждый переход при построении один раз пролетается той же
+    физикой, что у Player (sweep_platforms по всем платформам уровня),
+    поэтому промежуточные платформы на пути учтены. В запросах остается
+    только поиск по графу, а найденные пути запоминаются.
+    """
+
+    def __init__(self, spans, profile, platforms=None):
+        self.spans = list(spans)
+        self.profile = profile
+        # Без платформ полет проверяется по самим отрезкам (тонкие полосы)
+        self.platforms = platforms if platforms is not None else \
+            [pygame.Rect(left, top, right - left, 1) for left, right, top in self.spans]
+        width, height, speed, gravity, jump_power = profile
+        self.jump_heights = flight_heights(jump_power, gravity) if jump_power else None
+        self.drop_heights = flight_heights(0.0, gravity)
+        # Индекс узла -> [(сосед, действие, x отрыва (rect.x), стоимость в тиках)]
+        self.edges = [[] for _ in self.spans]
+        self.path_cache = {}
+        self.build_edges()
+
+    def build_edges(self):
+        for source, span in enumerate(self.spans):
+            for target, other in enumerate(self.spans):
+                if source == target:
+                    continue
+                # Самый дешевый из переходов, которые подтвердил полет
+                for edge in sorted(self.transition_candidates(span, other), key=lambda e: e[2]):
+                    if self.fly(source, target, edge[0], edge[1]):
+                        self.edges[source].append((target,) + edge)
+                        break
+
+    def standing_range(self, span):
+        """Допустимые rect.x, при которых ноги стоят на отрезке"""
+        width = self.profile[0]
+        return span[0] - width + FOOT_INSET + 1, span[1] - FOOT_INSET - 1
+
+    def transition_candidates(self, span, other):
+        """Переходы со span на other, возможные по высоте и дальности: (действие, x отрыва, тики)"""
+        speed = self.profile[2]
+        rise = span[2] - other[2]
+
+        # Спуск - просто сходим с края (только на отрезки ниже)
+        if rise < 0:
+            yield from self.drop_transitions(span, other, rise)
+
+        # Прыжок - в любую сторону, с места, где голова не упрется в цель снизу
+        if self.jump_heights:
+            air_ticks = last_tick_above(self.jump_heights, rise)
+            if air_ticks is not None:
+                for takeoff_x, distance in self.jump_takeoffs(span, other, rise):
+                    if distance <= speed * air_ticks:
+                        yield (JUMP, takeoff_x, air_ticks + 1)
+
+    def drop_transitions(self, span, other, rise):
+        speed = self.profile[2]
+        air_ticks = last_tick_above(self.drop_heights, rise)
+        if air_ticks is None:
+            return
+        reach = speed * air_ticks
+        low, high = self.standing_range(other)
+        width = self.profile[0]
+
+        # Падение начинается, только когда хитбокс целиком сошел с отрезка
+        # (ноги уже не на нем, но край хитбокса еще держит персонажа)
+        edge_x = span[1]
+        if high >= edge_x and low <= edge_x + reach:
+            yield (DROP, edge_x, air_ticks + 1)
+        # С левого края
+        edge_x = span[0] - width
+        if low <= edge_x and high >= edge_x - reach:
+            yield (DROP, edge_x, air_ticks + 1)
+
+    def jump_takeoffs(self, span, other, rise):
+        """Точки отрыва, ближайшие к цели с каждой стороны, и нужный путь по горизонтали"""
+        low, high = self.standing_range(span)
+        target_low, target_high = self.standing_range(other)
+        width = self.profile[0]
+
+        if rise > 0:
+            # Под более высоким отрезком прыгать нельзя - стоим сбоку от него
+            candidates = []
+            if low <= other[0] - width:
+                candidates.append(min(high, other[0] - width))
+            if high >= other[1]:
+                candidates.append(max(low, other[1]))
+        else:
+            candidates = [min(max(target_low, low), high), min(max(target_high, low), high)]
+
+        for takeoff_x in candidates:
+            if target_low <= takeoff_x <= target_high:
+                distance = 0
+            else:
+                distance = min(abs(takeoff_x - target_low), abs(takeoff_x - target_high))
+            yield takeoff_x, distance
+
+    def steer(self, rect_x, rect_bottom, target):
+        """Направление в полете (-1, 0, 1): к ближайшей точке, где ноги встанут на цель"""
+        width, _, speed, _, _ = self.profile
+        left, right, top = self.spans[target]
+        low, high = self.standing_range(self.spans[target])
+        goal_x = min(max(rect_x, low + speed), high - speed)
+        direction = 1 if goal_x > rect_x else -1 if goal_x < rect_x else 0
+
+        # Пока ноги ниже верха цели, в ее столбец не заходим - ударимся о край снизу/сбоку
+        moved_x = rect_x + direction * speed
+        if rect_bottom > top and moved_x + width > left and moved_x < right:
+            direction = 0
+        return direction
+
+    def fly(self, source, target, action, takeoff_x):
+        """Пролетает переход физикой Player; True - ноги встали на цель"""
+        width, height, speed, gravity, jump_power = self.profile
+        span = self.spans[source]
+        other = self.spans[target]
+        x = takeoff_x
+        y = span[2] - height
+        velocity_y = jump_power if action == JUMP else 0.0
+
+        # Только платформы в пределах возможной траектории
+        reach = speed * len(self.drop_heights)
+        top = min(span[2], other[2]) - height - (self.jump_heights and max(self.jump_heights) or 0)
+        area = pygame.Rect(min(span[0], other[0]) - width - reach, top,
+                           max(span[1], other[1]) - min(span[0], other[0]) + 2 * (width + reach),
+                           max(span[2], other[2]) - top + 1)
+        platforms = [platform for platform in self.platforms if area.colliderect(platform)]
+
+        # Над точкой отрыва должно хватать места - иначе персонаж внутри платформы
+        if pygame.Rect(x, y, width, height).collidelist(platforms) != -1:
+            return False
+
+        for _ in range(len(self.drop_heights)):
+            dx = self.steer(x, y + height, target) * speed
+            velocity_y += gravity
+            dy = velocity_y
+            landed = False
+
+            # Как Player.move_and_collide: до трех контактов за шаг
+            for _ in range(3):
+                if dx == 0 and dy == 0:
+                    break
+                hit_time, normal_x, normal_y = sweep_platforms(x, y, width, height, dx, dy, platforms)
+                x += dx * hit_time
+                y += dy * hit_time
+                if hit_time >= 1.0:
+                    break
+                remaining = 1.0 - hit_time
+                if normal_x:
+                    dx = 0
+                    dy *= remaining
+                else:
+                    if normal_y < 0:
+                        landed = True
+                    velocity_y = 0
+                    dy = 0
+                    dx *= remaining
+
+            if landed:
+                return self.find_span(pygame.Rect(x, y, width, height)) == target
+        return False
+
+    def find_span(self, rect):
+        """Индекс отрезка, на котором стоит rect, или None (в воздухе)"""
+        feet_left = rect.left + FOOT_INSET
+        feet_right = rect.right - FOOT_INSET
+        for index, (left, right, top) in enumerate(self.spans):
+            if abs(rect.bottom - top) <= 2 and feet_left < right and feet_right > left:
+                return index
+        return None
+
+    def heuristic(self, index, goal):
+        left, right, _ = self.spans[index]
+        goal_left, goal_right, _ = self.spans[goal]
+        gap = max(goal_left - right, left - goal_right, 0)
+        return gap / self.profile[2]
+
+    def find_path(self, start, goal):
+        """A* по графу: список шагов (отрезок, действие, x отрыва) или None"""
+        key = (start, goal)
+        if key in self.path_cache:
+            return self.path_cache[key]
+
+        path = None
+        open_heap = [(self.heuristic(start, goal), 0.0, start)]
+        came_from = {start: None}
+        costs = {start: 0.0}
+        while open_heap:
+            _, cost, index = heapq.heappop(open_heap)
+            if index == goal:
+                path = []
+                while came_from[index] is not None:
+                    previous, action, takeoff_x = came_from[index]
+                    path.append((index, action, takeoff_x))
+                    index = previous
+                path.reverse()
+                break
+            if cost > costs[index]:
+                continue
+            for target, action, takeoff_x, edge_cost in self.edges[index]:
+                new_cost = cost + edge_cost
+                if new_cost < costs.get(target, float('inf')):
+                    costs[target] = new_cost
+                    came_from[target] = (index, action, takeoff_x)
+                    heapq.heappush(open_heap, (new_cost + self.heuristic(target, goal), new_cost, target))
+
+        self.path_cache[key] = path
+        return path
+
+    def next_move(self, rect, target_rect):
+        """Что делать агенту сейчас: (действие, x, к которому идти) или None.
+
+        WALK - идти к x по текущему отрезку; JUMP/DROP - дойти до x отрыва
+        и прыгнуть/сойти с края. None - цель недостижима или агент в воздухе.
+        """
+        start = self.find_span(rect)
+        goal = self.find_span(target_rect)
+        if start is None or goal is None:
+            return None
+        if start == goal:
+            return WALK, target_rect.x
+        path = self.find_path(start, goal)
+        if not path:
+            return None
+        _, action, takeoff_x = path[0]
+        return action, takeoff_x
+
+# Графы по геометрии уровня и параметрам агента - строятся один раз на уровень
+NAV_GRAPHS = {}
+
+def get_nav_graph(platforms, profile, spans=None):
+    """Граф из кэша или новый; spans - готовые отрезки (как у сгенерированной арены)"""
+    key = (tuple((p.x, p.y, p.width, p.height) for p in platforms), profile)
+    graph = NAV_GRAPHS.get(key)
+    if graph is None:
+        graph = NAV_GRAPHS[key] = NavGraph(spans or merge_platform_spans(platforms), profile, platforms)
+    return graph
@@ -1,15 +1,49 @@
 import pygame
 import os
 import re
+from asset_cache import AssetCache
+from collision import sweep_platforms
+import telemetry
+from telemetry import Telemetry
+from texture_manager import TextureManager, AnimationSet
+from scheduler import Scheduler
+from startup_trace import trace
+import rules
 
 class Player:
     def __init__(self, x, y, screen, assets_path, game_manager=None, 
-                 controls=None, player_id=1, facing_right=True):
+                 controls=None, player_id=1, facing_right=True, character=rules.DEFAULT_CHARACTER):
         self.screen = screen
         self.assets_path = assets_path
         self.game_manager = game_manager
         self.player_id = player_id
         
+        # Масштаб внутреннего разрешения и общий кэш ассетов
+        if game_manager:
+            self.render_scale = game_manager.render_scale
+            self.asset_cache = game_manager.asset_cache
+            self.texture_manager = game_manager.texture_manager
+            self.telemetry = game_manager.telemetry
+            self.scheduler = game_manager.scheduler
+            self.tick_ms = game_manager.tick_ms
+            character_table = game_manager.rules
+        else:
+            self.render_scale = 1.0
+            self.telemetry = Telemetry(None)
+            self.asset_cache = AssetCache(assets_path, match_log=self.telemetry)
+            self.texture_manager = TextureManager()
+            # Без GameManager игрок сам ведет свои таймеры по времени pygame
+            self.scheduler = Scheduler()
+            self.tick_ms = 1000.0 / 60
+            character_table = rules.load_rules(rules.get_default_rules_path(assets_path))
+        # Скомпилированные правила персонажа: урон, кулдауны, окна ударов
+        self.rules = character_table[character]
+        # Данные текущего приема (MoveData) - их читает попадание
+        self.current_move = self.rules.attack
+        # Размер кадра в мировых координатах и во внутреннем разрешении
+        self.world_frame_size = (100, 150)
+        self.frame_size = (int(100 * self.render_scale), int(150 * self.render_scale))
+        
         # Начальная позиция для возрождения
         self.spawn_position = pygame.Vector2(x, y)
         
@@ -28,8 +62,12 @@ class Player:
         
         # Боевая система
         self.setup_combat()
+        # Номер замаха - по нему орда отличает новый удар от того же;
+        # не сбрасывается в reset, чтобы номера не повторялись
+        self.swings = 0
         
         # Анимации
+        self.spawn_facing_right = facing_right
         self.setup_animations(facing_right)
         
         # Состояния и таймеры
@@ -38,23 +76,29 @@ class Player:
     def setup_physics(self, x, y):
         self.position = pygame.Vector2(x, y)
         self.velocity = pygame.Vector2(0, 0)
+        # Позиция на предыдущем тике - для интерполяции отрисовки
+        self.previous_position = pygame.Vector2(x, y)
         
-        self.gravity = 0.5
-        self.jump_power = -12
-        self.speed = 5
+        # Копии из правил - физика читает их каждый тик как обычные атрибуты
+        self.gravity = self.rules.gravity
+        self.jump_power = self.rules.jump_power
+        self.speed = self.rules.speed
         self.ground_check_margin = 5
         
         self.rect = pygame.Rect(x, y, 80, 120)
+        # Переиспользуемый прямоугольник проверки земли (без аллокаций в тике)
+        self.ground_check = pygame.Rect(0, 0, 0, 0)
         self.on_ground = True
         self.is_jumping = False
         self.was_on_ground = True
     
     def setup_combat(self):
-        self.health = 100
-        self.attack_damage = 10
-        self.heavy_attack_damage = 20
+        self.health = self.rules.health
+        self.attack_damage = self.rules.attack.damage
         self.attack_hitbox = pygame.Rect(0, 0, 0, 0)
-        self.attack_range = 70
+        # Прямоугольник спрайта в мире - для точной проверки по маске
+        self.sprite_rect = pygame.Rect(0, 0, 100, 150)
+        self.attack_range = self.rules.attack_range
         self.attack_active = False
         self.attack_animation_completed = False
     
@@ -78,15 +122,17 @@ class Player:
         }
         
         # ВРЕМЯ АНИМАЦИЙ В СЕКУНДАХ
+        # (длительность атак задают правила персонажа)
         self.animation_durations = {
-            "attack": 0.7,
-            "heavy_attack": 1.0,
+            "attack": self.rules.attack.duration,
+            "heavy_attack": self.rules.heavy_attack.duration,
             "hurt": 0.5,
             "death": 1.5,
             "respawn": 1.0  # 1 секунда на анимацию возрождения
         }
         
-        self.load_animations()
+        with trace.span(f"player{self.player_id}.load_animations"):
+            self.load_animations()
     
     def setup_state(self):
         self.actions = {
@@ -98,12 +144,22 @@ class Player:
             'respawning': False  # Новое состояние - возрождение
         }
         
-        self.cooldowns = {
-            'attack': 0,
-            'heavy_attack': 0,
-            'stun': 0,
-            'attack_hit_timer': 0,
-            'respawn_timer': 0  # Таймер возрождения
+        # Время симуляции (мс), до которого действие недоступно; каждый тик
+        # ничего не пересчитывается - просто сравниваем с текущим временем
+        self.cooldown_ends = {
+            'attack': 0.0,
+            'heavy_attack': 0.0,
+            'stun': 0.0
+        }
+        
+        # Активные таймеры планировщика по именам (для отмены)
+        self.timers = {
+            'attack_hit_start': None,
+            'attack_hit_end': None,
+            'attack_end': None,
+            'stun_end': None,
+            'respawn': None,
+            'respawn_end': None
         }
         
         self.animation_flags = {
@@ -114,6 +170,21 @@ class Player:
             'respawn_animation_completed': False
         }
         
+        # Состояние движения, которое InputRouter опрашивает раз в тик
+        self.input_left = False
+        self.input_right = False
+        
+        # Обработчики действий по нажатию и отпусканию
+        self.press_handlers = {
+            'jump': self.jump,
+            'attack': self.attack,
+            'heavy_attack': self.heavy_attack,
+            'block': self.start_block
+        }
+        self.release_handlers = {
+            'block': self.stop_block
+        }
+        
         # Таймеры для контроля времени анимаций
         self.animation_timers = {
             'attack_start_time': 0,
@@ -122,12 +193,44 @@ class Player:
             'current_animation_duration': 0
         }
     
+    def get_time(self):
+        """Время симуляции в мс (без GameManager - реальное время pygame)"""
+        if self.game_manager:
+            return self.game_manager.time_ms
+        return pygame.time.get_ticks()
+    
     def get_animation_speed(self, animation_name):
         return self.animation_speeds.get(animation_name, 10)
     
+    def set_timer(self, name, delay_ms, callback):
+        """Ставит именованный таймер, отменяя прежний с тем же именем"""
+        scheduler = self.scheduler
+        scheduler.cancel(self.timers[name])
+        self.timers[name] = scheduler.schedule_at(self.get_time() + delay_ms, callback)
+    
+    def cancel_timers(self, *names):
+        for name in names or tuple(self.timers):
+            self.scheduler.cancel(self.timers[name])
+            self.timers[name] = None
+    
+    def start_cooldown(self, name, ticks):
+        self.cooldown_ends[name] = self.get_time() + ticks * self.tick_ms
+    
+    def cooldown_remaining(self, name):
+        """Сколько тиков осталось до конца кулдауна"""
+        return max(0.0, (self.cooldown_ends[name] - self.get_time()) / self.tick_ms)
+    
     def get_animation_duration(self, animation_name):
         return self.animation_durations.get(animation_name, 1.0)
     
+    def get_hurt_mask(self):
+        """Маска текущего кадра и прямоугольник спрайта в мировых координатах"""
+        masks = self.animations.masks(self.current_animation)
+        frame_index = min(int(self.animation_frame), len(masks) - 1)
+        self.sprite_rect.topleft = self.rect.topleft
+        # Исходные кадры смотрят влево - при взгляде вправо берем отраженную маску
+        return masks[frame_index][1 if self.facing_right else 0], self.sprite_rect
+    
     def is_facing_attacker(self, attacker):
         if attacker.rect.centerx > self.rect.centerx:
             return not self.facing_right
@@ -135,7 +238,7 @@ class Player:
             return self.facing_right
     
     def load_animations(self):
-        animation_folders = {
+        self.animation_folders = {
             "idle": "player/idle",
             "walk": "player/walk", 
             "attack": "player/attack",
@@ -147,12 +250,27 @@ class Player:
             "respawn": "player/respawn"  # Новая папка для анимации возрождения
         }
         
-        for state, folder in animation_folders.items():
-            self.animations[state] = self.load_animation_frames(folder)
-            frame_count = len(self.animations[state])
-            print(f"Загружено {frame_count} кадров для {state}")
+        # Кадры живут в TextureManager: общие для всех игроков и выгружаемые
+        # при нехватке памяти, при следующем обращении загрузятся заново
+        # Маски попаданий строятся сразу и всегда из кадров мирового размера,
+        # поэтому исход удара не зависит от разрешения отрисовки
+        self.animations = AnimationSet(self.texture_manager, 'player', self.frame_size,
+                                       list(self.animation_folders), self.load_animation,
+                                       self.load_hit_frames)
+        self.animations.preload()
+    
+    def load_animation(self, state):
+        frames = self.load_animation_frames(self.animation_folders[state], self.frame_size)
+        self.telemetry.record(telemetry.ANIMATION_LOADED, self.player_id, state, len(frames))
+        return frames
+    
+    def load_hit_frames(self, state):
+        """Кадры для масок попаданий - в мировом размере"""
+        if self.frame_size == self.world_frame_size:
+            return self.animations[state]
+        return self.load_animation_frames(self.animation_folders[state], self.world_frame_size)
     
-    def load_animation_frames(self, folder):
+    def load_animation_frames(self, folder, size):
         frames = []
         full_path = os.path.join(self.assets_path, folder)
         
@@ -173,21 +291,21 @@ class Player:
                 for filename in image_files:
                     image_path = os.path.join(full_path, filename)
                     try:
-                        image = pygame.image.load(image_path).convert_alpha()
-                        image = pygame.transform.scale(image, (100, 150))
+                        image = self.asset_cache.load_image(image_path, size,
+                                                            remember=False)
                         frames.append(image)
                     except Exception as e:
-                        print(f"Ошибка загрузки {image_path}: {e}")
+                        self.telemetry.record(telemetry.ERROR, image_path, str(e))
                         
             except Exception as e:
-                print(f"Ошибка обработки папки {folder}: {e}")
+                self.telemetry.record(telemetry.ERROR, folder, str(e))
         
         if not frames:
-            frames = self.create_placeholder_animation(folder.split('/')[-1])
+            frames = self.create_placeholder_animation(folder.split('/')[-1], size)
             
         return frames
     
-    def create_placeholder_animation(self, state):
+    def create_placeholder_animation(self, state, size):
         color_map = {
             "idle": (0, 255, 0),
             "walk": (255, 255, 0),
@@ -215,75 +333,60 @@ class Player:
         frames_count = frames_config.get(state, 1)
         frames = []
         
+        width, height = size
         for i in range(frames_count):
-            surf = pygame.Surface((100, 150), pygame.SRCALPHA)
+            surf = pygame.Surface((width, height), pygame.SRCALPHA)
             color = color_map.get(state, (255, 255, 255))
             
-            pygame.draw.rect(surf, color, (0, 0, 100, 150))
+            pygame.draw.rect(surf, color, (0, 0, width, height))
             
-            font = pygame.font.Font(None, 20)
+            font = pygame.font.Font(None, max(8, int(20 * width / self.world_frame_size[0])))
             frame_text = font.render(f"{state} {i}", True, (0, 0, 0))
-            frame_rect = frame_text.get_rect(center=(50, 75))
+            frame_rect = frame_text.get_rect(center=(width // 2, height // 2))
             surf.blit(frame_text, frame_rect)
             
-            pygame.draw.rect(surf, (0, 0, 0), (0, 0, 100, 150), 2)
+            pygame.draw.rect(surf, (0, 0, 0), (0, 0, width, height), 2)
             frames.append(surf)
         
         return frames
 
-    def handle_event(self, event):
-        if event.type == pygame.KEYDOWN:
-            if event.key == self.controls['jump']:
-                self.jump()
-            elif event.key == self.controls['attack']:
-                self.attack()
-            elif event.key == self.controls['heavy_attack']:
-                self.heavy_attack()
-            elif event.key == self.controls['block']:
-                self.start_block()
-        
-        elif event.type == pygame.KEYUP:
-            if event.key == self.controls['block']:
-                self.stop_block()
+    def handle_action(self, action, pressed):
+        """Вызывается InputRouter при нажатии/отпускании привязанной кнопки"""
+        handler = (self.press_handlers if pressed else self.release_handlers).get(action)
+        if handler:
+            handler()
 
     def handle_input(self):
         # ЕСЛИ ИГРОК МЕРТВ ИЛИ ВОЗРОЖДАЕТСЯ - НИКАКОГО ВВОДА
         if self.actions['dead'] or self.actions['respawning']:
             self.velocity.x = 0
             return
-            
-        keys = pygame.key.get_pressed()
         
         if self.actions['stunned']:
             return
         
-        if keys[self.controls['left']]:
+        # Флаги движения выставляет InputRouter.sample() раз в тик
+        if self.input_left:
             self.velocity.x = -self.speed
             self.facing_right = False
-        elif keys[self.controls['right']]:
+        elif self.input_right:
             self.velocity.x = self.speed
             self.facing_right = True
         else:
             self.velocity.x = 0
 
     def attack(self):
-        if (self.actions['attacking'] or self.cooldowns['attack'] > 0 or 
+        if (self.actions['attacking'] or self.get_time() < self.cooldown_ends['attack'] or 
             self.actions['stunned'] or self.actions['dead'] or self.actions['respawning']):
             return
             
         self.actions['attacking'] = True
         self.current_animation = "attack"
         self.animation_frame = 0
-        self.cooldowns['attack'] = 45
-        self.attack_damage = 10
-        self.attack_active = False
-        self.animation_flags['attack_animation_completed'] = False
-        
-        self.animation_timers['attack_start_time'] = pygame.time.get_ticks()
-        self.animation_timers['current_animation_duration'] = self.get_animation_duration("attack")
+        self.start_attack_timers(self.rules.attack)
 
     def heavy_attack(self):
-        if (self.actions['attacking'] or self.cooldowns['heavy_attack'] > 0 or 
+        if (self.actions['attacking'] or self.get_time() < self.cooldown_ends['heavy_attack'] or 
             self.actions['stunned'] or self.actions['dead'] or self.actions['respawning']):
             return
             
@@ -291,24 +394,51 @@ class Player:
         self.actions['heavy_attacking'] = True
         self.current_animation = "heavy_attack"
         self.animation_frame = 0
-        self.cooldowns['heavy_attack'] = 60
-        self.attack_damage = 20
+        self.start_attack_timers(self.rules.heavy_attack)
+
+    def start_attack_timers(self, move):
+        """Кулдаун, урон и таймеры приема: окно удара и конец атаки - из правил"""
+        self.current_move = move
+        self.swings += 1
+        self.start_cooldown(move.name, move.cooldown)
+        self.attack_damage = move.damage
         self.attack_active = False
         self.animation_flags['attack_animation_completed'] = False
         
-        self.animation_timers['attack_start_time'] = pygame.time.get_ticks()
-        self.animation_timers['current_animation_duration'] = self.get_animation_duration("heavy_attack")
+        self.animation_timers['attack_start_time'] = self.get_time()
+        self.animation_timers['current_animation_duration'] = move.duration
+        self.set_timer('attack_hit_start', move.hit_start_ms, self.activate_attack_hitbox)
+        self.set_timer('attack_hit_end', move.hit_end_ms, self.deactivate_attack_hitbox)
+        self.set_timer('attack_end', move.duration_ms, self.end_attack)
+
+    def activate_attack_hitbox(self):
+        self.timers['attack_hit_start'] = None
+        self.attack_active = True
+        self.create_attack_hitbox()
+
+    def deactivate_attack_hitbox(self):
+        self.timers['attack_hit_end'] = None
+        self.attack_active = False
+
+    def end_attack(self):
+        """Завершает атаку: по таймеру, после попадания или при смерти"""
+        self.cancel_timers('attack_hit_start', 'attack_hit_end', 'attack_end')
+        self.actions['attacking'] = False
+        self.actions['heavy_attacking'] = False
+        self.attack_active = False
+        self.animation_flags['attack_animation_completed'] = False
 
     def create_attack_hitbox(self):
+        # Обновляем существующий хитбокс на месте вместо создания нового Rect
         if self.facing_right:
-            self.attack_hitbox = pygame.Rect(
+            self.attack_hitbox.update(
                 self.rect.right,
                 self.rect.centery - 30,
                 self.attack_range,
                 60
             )
         else:
-            self.attack_hitbox = pygame.Rect(
+            self.attack_hitbox.update(
                 self.rect.left - self.attack_range,
                 self.rect.centery - 30,
                 self.attack_range,
@@ -333,158 +463,184 @@ class Player:
             self.on_ground = False
             self.animation_flags['jump_started'] = True
             self.animation_flags['jump_completed'] = False
+            self.telemetry.record(telemetry.JUMP, self.player_id)
             
             if self.game_manager:
                 self.game_manager.play_sound('jump')
 
     def take_damage(self, damage):
+        """Наносит урон; возвращает урон, который действительно прошел"""
         # Не получаем урон если мертвы или возрождаемся
         if self.actions['dead'] or self.actions['respawning']:
-            return
+            return 0
             
+        health = self.health
         self.health = max(0, self.health - damage)
         
         if self.health > 0:
             self.current_animation = "hurt"
             self.animation_frame = 0
-            self.stun(30)
+            self.stun(self.rules.hit_stun)
         else:
             self.die()
+        return health - self.health
 
     def knockback(self, direction_right, force):
         self.velocity.x = force if direction_right else -force
-        self.velocity.y = -3
+        self.velocity.y = -self.rules.knockback_lift
+        self.telemetry.record(telemetry.KNOCKBACK, self.player_id, force)
 
     def stun(self, duration):
         self.actions['stunned'] = True
-        self.cooldowns['stun'] = duration
+        self.start_cooldown('stun', duration)
+        self.set_timer('stun_end', duration * self.tick_ms, self.end_stun)
+
+    def end_stun(self):
+        self.timers['stun_end'] = None
+        self.actions['stunned'] = False
 
     def die(self):
         self.actions['dead'] = True
         self.current_animation = "death"
         self.animation_frame = 0
-        self.velocity = pygame.Vector2(0, 0)
+        self.velocity.update(0, 0)
         self.animation_flags['death_animation_completed'] = False
+        self.end_attack()
+        self.cancel_timers('stun_end')
         
-        # Запоминаем время смерти для таймера возрождения
-        self.animation_timers['death_start_time'] = pygame.time.get_ticks()
+        # Возрождение через respawn_ms из правил; время смерти - для таймера в режиме отладки
+        self.animation_timers['death_start_time'] = self.get_time()
+        self.set_timer('respawn', self.rules.respawn_ms, self.respawn)
         
-        print(f"Игрок {self.player_id} умер, возрождение через 5 секунд")
+        self.telemetry.record(telemetry.DEATH, self.player_id)
 
     def respawn(self):
         """Возрождает игрока"""
         self.actions['dead'] = False
         self.actions['respawning'] = True
         self.actions['stunned'] = False
-        self.health = 100
+        self.health = self.rules.health
         self.current_animation = "respawn"
         self.animation_frame = 0
         self.animation_flags['respawn_animation_completed'] = False
         
         # Возвращаем на начальную позицию
-        self.position = pygame.Vector2(self.spawn_position.x, self.spawn_position.y)
+        self.position.update(self.spawn_position)
         self.rect.x = self.position.x
         self.rect.y = self.position.y
-        self.velocity = pygame.Vector2(0, 0)
+        self.velocity.update(0, 0)
+        # Телепорт - не интерполируем от места смерти
+        self.previous_position.update(self.position)
         
-        self.animation_timers['respawn_start_time'] = pygame.time.get_ticks()
-        self.animation_timers['current_animation_duration'] = self.get_animation_duration("respawn")
+        self.timers['respawn'] = None
+        duration = self.get_animation_duration("respawn")
+        self.animation_timers['respawn_start_time'] = self.get_time()
+        self.animation_timers['current_animation_duration'] = duration
+        self.set_timer('respawn_end', duration * 1000.0, self.finish_respawn)
         
-        print(f"Игрок {self.player_id} возрождается!")
+        self.telemetry.record(telemetry.RESPAWN, self.player_id, 'start')
 
-    def update(self, platforms, players):
+    def finish_respawn(self):
+        """Конец анимации возрождения - игрок снова в бою"""
+        self.timers['respawn_end'] = None
+        self.actions['respawning'] = False
+        self.current_animation = "idle"
+        self.animation_frame = 0
+        self.telemetry.record(telemetry.RESPAWN, self.player_id, 'complete')
+
+    def reset(self):
+        """Возвращает игрока в начальное состояние нового раунда"""
+        self.cancel_timers()
+        self.setup_combat()
+        self.setup_state()
+        self.current_animation = "idle"
+        self.animation_frame = 0
+        self.facing_right = self.spawn_facing_right
+        self.velocity.update(0, 0)
+        self.on_ground = False
+        self.is_jumping = False
+        self.set_spawn(self.spawn_position.x, self.spawn_position.y)
+
+    def set_spawn(self, x, y):
+        """Переносит точку возрождения и ставит туда игрока"""
+        self.spawn_position.update(x, y)
+        self.position.update(x, y)
+        self.previous_position.update(x, y)
+        self.rect.x = x
+        self.rect.y = y
+
+    def store_previous_state(self):
+        self.previous_position.update(self.position)
+
+    def update(self, platforms, players, dt=1.0):
+        # dt - длина шага в базовых тиках (1.0 = 1/60 с); крупный шаг
+        # безопасен за счет непрерывных столкновений в apply_physics
         self.was_on_ground = self.on_ground
         
-        # ОБНОВЛЯЕМ ВОЗРОЖДЕНИЕ
-        self.update_respawn()
+        # Таймеры (атаки, оглушение, возрождение) срабатывают в планировщике;
+        # без GameManager продвигаем свой планировщик сами
+        if not self.game_manager:
+            self.scheduler.advance(self.get_time())
         
         # ЕСЛИ МЕРТВ ИЛИ ВОЗРОЖДАЕТСЯ - ТОЛЬКО ОБНОВЛЯЕМ АНИМАЦИЮ
         if self.actions['dead'] or self.actions['respawning']:
-            self.update_animation()
+            self.update_animation(dt)
             return
             
         self.handle_input()
-        self.apply_physics()
+        self.apply_physics(platforms, dt)
         self.handle_collisions(platforms)
-        self.update_cooldowns()
         self.update_animation_state()
-        self.update_animation()
-        self.update_attack_hitbox()
+        self.update_animation(dt)
         
         if self.animation_flags['jump_started'] and self.animation_frame > 0:
             self.animation_flags['jump_started'] = False
     
-    def update_respawn(self):
-        """Обновляет логику возрождения"""
-        if self.actions['dead'] and not self.actions['respawning']:
-            # Проверяем прошло ли 5 секунд с момента смерти
-            current_time = pygame.time.get_ticks()
-            time_since_death = (current_time - self.animation_timers['death_start_time']) / 1000.0
-            
-            if time_since_death >= 5.0:  # 5 секунд
-                self.respawn()
-        
-        elif self.actions['respawning']:
-            # Проверяем завершилась ли анимация возрождения
-            current_time = pygame.time.get_ticks()
-            elapsed_time = (current_time - self.animation_timers['respawn_start_time']) / 1000.0
-            
-            if elapsed_time >= self.animation_timers['current_animation_duration']:
-                # Завершаем возрождение
-                self.actions['respawning'] = False
-                self.current_animation = "idle"
-                self.animation_frame = 0
-                print(f"Игрок {self.player_id} полностью возродился!")
-    
-    def update_attack_hitbox(self):
-        if self.actions['attacking']:
-            current_time = pygame.time.get_ticks()
-            elapsed_time = (current_time - self.animation_timers['attack_start_time']) / 1000.0
-            progress = elapsed_time / self.animation_timers['current_animation_duration']
-            
-            if progress >= 0.7 and not self.attack_active:
-                self.attack_active = True
-                self.create_attack_hitbox()
-            
-            if progress >= 0.95 and self.attack_active:
-                self.attack_active = False
-        else:
-            self.attack_active = False
-    
-    def update_cooldowns(self):
-        for key in self.cooldowns:
-            if self.cooldowns[key] > 0:
-                self.cooldowns[key] -= 1
-        
-        # Завершение атаки по времени
-        if self.actions['attacking']:
-            current_time = pygame.time.get_ticks()
-            elapsed_time = (current_time - self.animation_timers['attack_start_time']) / 1000.0
-            
-            if elapsed_time >= self.animation_timers['current_animation_duration']:
-                self.actions['attacking'] = False
-                self.actions['heavy_attacking'] = False
-                self.attack_active = False
-                self.animation_flags['attack_animation_completed'] = False
-        
-        if self.actions['stunned'] and self.cooldowns['stun'] <= 0:
-            self.actions['stunned'] = False
-
-    def apply_physics(self):
+    def apply_physics(self, platforms=(), dt=1.0):
         if not self.on_ground:
-            self.velocity.y += self.gravity
+            self.velocity.y += self.gravity * dt
         
         if self.actions['blocking']:
             self.velocity.x *= 0.7
         
-        self.position += self.velocity
+        self.move_and_collide(platforms, self.velocity.x * dt, self.velocity.y * dt)
         self.rect.x = self.position.x
         self.rect.y = self.position.y
+    
+    def move_and_collide(self, platforms, dx, dy):
+        """Непрерывное перемещение: упираемся в первую платформу на пути и скользим вдоль нее"""
+        position = self.position
+        width, height = self.rect.width, self.rect.height
+        
+        # Не больше трех контактов за шаг (пол + стена + потолок)
+        for _ in range(3):
+            if dx == 0 and dy == 0:
+                return
+            
+            hit_time, normal_x, normal_y = sweep_platforms(
+                position.x, position.y, width, height, dx, dy, platforms)
+            
+            position.x += dx * hit_time
+            position.y += dy * hit_time
+            if hit_time >= 1.0:
+                return
+            
+            # Гасим скорость вдоль нормали и продолжаем остаток шага вдоль поверхности
+            remaining = 1.0 - hit_time
+            if normal_x:
+                self.velocity.x = 0
+                dx = 0
+                dy *= remaining
+            else:
+                self.velocity.y = 0
+                dy = 0
+                dx *= remaining
 
     def handle_collisions(self, platforms):
         self.on_ground = False
         
-        ground_check = pygame.Rect(
+        ground_check = self.ground_check
+        ground_check.update(
             self.rect.left + 8, 
             self.rect.bottom, 
             self.rect.width - 16, 
@@ -506,15 +662,19 @@ class Player:
                     self.animation_flags['jump_completed'] = True
 
     def resolve_collision(self, platform):
-        overlaps = {
-            'top': self.rect.bottom - platform.top,
-            'bottom': platform.bottom - self.rect.top,
-            'left': self.rect.right - platform.left,
-            'right': platform.right - self.rect.left
-        }
-        
-        min_direction = min(overlaps, key=overlaps.get)
-        min_overlap = overlaps[min_direction]
+        # Выбираем наименьшее перекрытие без создания словаря на каждый контакт
+        # (порядок сравнений как у min() по top, bottom, left, right)
+        min_direction = 'top'
+        min_overlap = self.rect.bottom - platform.top
+        overlap = platform.bottom - self.rect.top
+        if overlap < min_overlap:
+            min_direction, min_overlap = 'bottom', overlap
+        overlap = self.rect.right - platform.left
+        if overlap < min_overlap:
+            min_direction, min_overlap = 'left', overlap
+        overlap = platform.right - self.rect.left
+        if overlap < min_overlap:
+            min_direction, min_overlap = 'right', overlap
         
         if min_direction == 'top' and self.velocity.y > 0:
             self.rect.bottom = platform.top
@@ -559,14 +719,14 @@ class Player:
         else:
             self.current_animation = "idle"
 
-    def update_animation(self):
+    def update_animation(self, dt=1.0):
         if not self.animations[self.current_animation]:
             return
             
         frames = self.animations[self.current_animation]
         max_frame = len(frames) - 1
         
-        animation_speed = self.get_animation_speed(self.current_animation) / 60.0
+        animation_speed = self.get_animation_speed(self.current_animation) / 60.0 * dt
         
         # ХОДЬБА - ЗАЦИКЛИВАЕМ
         if self.current_animation == "walk":
@@ -591,7 +751,7 @@ class Player:
         # АТАКИ - проигрываются по времени
         elif self.current_animation in ["attack", "heavy_attack"]:
             if self.actions['attacking']:
-                current_time = pygame.time.get_ticks()
+                current_time = self.get_time()
                 elapsed_time = (current_time - self.animation_timers['attack_start_time']) / 1000.0
                 progress = elapsed_time / self.animation_timers['current_animation_duration']
                 
@@ -609,7 +769,7 @@ class Player:
         # ВОЗРОЖДЕНИЕ - проигрывается один раз полностью
         elif self.current_animation == "respawn":
             if self.actions['respawning']:
-                current_time = pygame.time.get_ticks()
+                current_time = self.get_time()
                 elapsed_time = (current_time - self.animation_timers['respawn_start_time']) / 1000.0
                 progress = elapsed_time / self.animation_timers['current_animation_duration']
                 
@@ -634,7 +794,7 @@ class Player:
         if self.animation_frame < 0:
             self.animation_frame = 0
 
-    def draw(self, camera_offset):
+    def draw(self, camera_offset, alpha=1.0):
         frames = self.animations[self.current_animation]
         if not frames:
             return
@@ -645,14 +805,19 @@ class Player:
         if self.facing_right:
             current_frame = pygame.transform.flip(current_frame, True, False)
         
-        draw_x = self.rect.x - camera_offset[0]
-        draw_y = self.rect.y - camera_offset[1]
+        # Интерполируем между двумя последними тиками симуляции
+        # и переводим мировые координаты во внутреннее разрешение
+        previous = self.previous_position
+        scale = self.render_scale
+        draw_x = (previous.x + (self.position.x - previous.x) * alpha - camera_offset[0]) * scale
+        draw_y = (previous.y + (self.position.y - previous.y) * alpha - camera_offset[1]) * scale
         
         self.screen.blit(current_frame, (draw_x, draw_y))
         
         # Отладочная информация
-        if self.game_manager and self.game_manager.debug_mode:
-            font = pygame.font.Font(None, 24)
+        # Шрифт общий из GameManager; до отложенной инициализации его нет
+        font = self.game_manager.get_font(24) if self.game_manager and self.game_manager.debug_mode else None
+        if font:
             frames = self.animations[self.current_animation]
             
             anim_text = f"{self.current_animation}: {int(self.animation_frame)+1}/{len(frames)}"
@@ -661,9 +826,9 @@ class Player:
             
             # Таймер возрождения
             if self.actions['dead']:
-                current_time = pygame.time.get_ticks()
+                current_time = self.get_time()
                 time_since_death = (current_time - self.animation_timers['death_start_time']) / 1000.0
-                respawn_time = max(0, 5.0 - time_since_death)
+                respawn_time = max(0, self.rules.respawn_ms / 1000.0 - time_since_death)
                 respawn_text = f"Respawn in: {respawn_time:.1f}s"
                 respawn_surf = font.render(respawn_text, True, (255, 100, 100))
                 self.screen.blit(respawn_surf, (draw_x, draw_y - 40))
\ No newline at end of file
@@ -0,0 +1,97 @@
+import os
+import json
+from collections import namedtuple
+
+RULES_VERSION = 1
+DEFAULT_CHARACTER = 'fighter'
+MOVE_NAMES = ('attack', 'heavy_attack')
+
+# Прием после компиляции: кулдаун в тиках, окно удара и длительность - в мс симуляции
+MoveData = namedtuple('MoveData', (
+    'name', 'damage', 'cooldown', 'duration', 'duration_ms',
+    'hit_start_ms', 'hit_end_ms', 'knockback'))
+
+# Плоская неизменяемая таблица персонажа; приемы - отдельными полями, без словарей
+CharacterRules = namedtuple('CharacterRules', (
+    'name', 'health', 'speed', 'gravity', 'jump_power', 'attack_range',
+    'block_damage_scale', 'hit_stun', 'knockback_lift', 'respawn_ms',
+    'attack', 'heavy_attack'))
+
+def get_default_rules_path(assets_path):
+    return os.path.join(assets_path, 'rules', 'fighters.json')
+
+def number(data, key):
+    """Числовое поле как есть (целые остаются целыми - как в журнале матча)"""
+    value = data[key]
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise TypeError(f"{key} - не число: {value!r}")
+    return value
+
+def compile_move(path, character, name, data):
+    try:
+        hit_start, hit_end = data['active']
+        duration = number(data, 'duration')
+        move = MoveData(name, number(data, 'damage'), int(number(data, 'cooldown')), duration,
+                        duration * 1000.0, duration * 1000.0 * hit_start,
+                        duration * 1000.0 * hit_end, number(data, 'knockback'))
+        if not 0.0 <= hit_start <= hit_end <= 1.0:
+            raise ValueError("окно удара вне анимации")
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"правила {path}: {character}.{name}: {e!r}")
+    return move
+
+def resolve_character(path, characters, name, chain=()):
+    """Данные персонажа с учетом extends: свои поля поверх полей базового"""
+    if name in chain:
+        raise ValueError(f"правила {path}: цикл в extends: {' -> '.join(chain + (name,))}")
+    if name not in characters:
+        raise ValueError(f"правила {path}: нет персонажа {name}")
+    data = characters[name]
+    base = data.get('extends')
+    if base is None:
+        return data
+
+    merged = dict(resolve_character(path, characters, base, chain + (name,)))
+    moves = dict(merged.get('moves', {}))
+    for move_name, move in data.get('moves', {}).items():
+        moves[move_name] = dict(moves.get(move_name, {}), **move)
+    merged.update(data)
+    merged['moves'] = moves
+    return merged
+
+def compile_character(path, characters, name):
+    data = resolve_character(path, characters, name)
+    moves = data.get('moves', {})
+    compiled_moves = [compile_move(path, name, move_name, moves.get(move_name, {}))
+                      for move_name in MOVE_NAMES]
+    try:
+        character = CharacterRules(
+            name, number(data, 'health'), number(data, 'speed'), number(data, 'gravity'),
+            number(data, 'jump_power'), int(number(data, 'attack_range')),
+            number(data, 'block_damage_scale'), int(number(data, 'hit_stun')),
+            number(data, 'knockback_lift'), number(data, 'respawn_time') * 1000.0,
+            *compiled_moves)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"правила {path}: {name}: {e!r}")
+    # Без гравитации прыжок не кончается, а граф навигации не строится
+    if not character.gravity > 0:
+        raise ValueError(f"правила {path}: {name}: gravity должна быть больше нуля")
+    return character
+
+def compile_rules(path):
+    """Читает файл правил и компилирует всех персонажей: {имя: CharacterRules}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != RULES_VERSION:
+        raise ValueError(f"неизвестная версия правил: {path}")
+    characters = data.get('characters', {})
+    return {name: compile_character(path, characters, name) for name in characters}
+
+# Скомпилированные правила по пути файла - читаются один раз на процесс
+RULES = {}
+
+def load_rules(path):
+    rules = RULES.get(path)
+    if rules is None:
+        rules = RULES[path] = compile_rules(path)
+    return rules
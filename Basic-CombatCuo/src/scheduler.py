@@ -0,0 +1,56 @@
+import heapq
+
+# Время симуляции копится сложением дробных тиков - допуск, чтобы таймер
+# ровно на N тиков вперед не опаздывал на тик из-за погрешности
+TIME_EPSILON = 1e-6
+
+class Scheduler:
+    """Очередь таймеров по времени симуляции (двоичная куча).
+
+    Таймер стоит ровно одну вставку в кучу и ничего не стоит, пока не
+    сработал, - сущности без активных таймеров не опрашиваются вовсе.
+    Отмена ленивая: у записи стирается callback, а сама запись уходит
+    из кучи, когда до нее дойдет время.
+    """
+
+    def __init__(self):
+        # Записи [время, порядковый номер, callback, аргументы]
+        self.queue = []
+        # Номер разводит таймеры с одинаковым временем в порядке постановки
+        self.counter = 0
+        self.now = 0.0
+        self.fired = 0
+
+    def schedule_at(self, time_ms, callback, *args):
+        """Ставит таймер на момент time_ms; возвращает запись для cancel()"""
+        entry = [time_ms, self.counter, callback, args]
+        self.counter += 1
+        heapq.heappush(self.queue, entry)
+        return entry
+
+    def schedule(self, delay_ms, callback, *args):
+        return self.schedule_at(self.now + delay_ms, callback, *args)
+
+    def cancel(self, entry):
+        if entry is not None:
+            entry[2] = None
+            entry[3] = ()
+
+    def advance(self, now):
+        """Переводит время на now и вызывает все истекшие таймеры по порядку"""
+        self.now = now
+        deadline = now + TIME_EPSILON
+        queue = self.queue
+        while queue and queue[0][0] <= deadline:
+            _, _, callback, args = heapq.heappop(queue)
+            if callback is not None:
+                self.fired += 1
+                callback(*args)
+
+    def reset(self, now=0.0):
+        """Сбрасывает время (новый матч); все таймеры отменяются"""
+        self.queue.clear()
+        self.now = now
+
+    def __len__(self):
+        return len(self.queue)
@@ -0,0 +1,222 @@
+import time
+import queue
+import threading
+import multiprocessing
+from array import array
+from multiprocessing import shared_memory
+
+from headless import init_headless
+
+SOUND_NAMES = ('attack', 'heavy_attack', 'block', 'jump', 'hit')
+PLAYER_FLAGS = ('attacking', 'heavy_attacking', 'blocking', 'stunned', 'dead', 'respawning')
+
+# Заголовок: время публикации, время симуляции, камера (текущая и прошлая), счетчики звуков
+HEADER_SIZE = 6 + len(SOUND_NAMES)
+# x, y, прошлые x/y, здоровье, направление, анимация, кадр, флаги, активность удара, хитбокс
+PLAYER_SIZE = 8 + len(PLAYER_FLAGS) + 1 + 4
+NUM_PLAYERS = 2
+SNAPSHOT_SIZE = HEADER_SIZE + NUM_PLAYERS * PLAYER_SIZE
+# Номер последнего опубликованного слота + два слота (счетчик seqlock + данные)
+BUFFER_SIZE = 1 + 2 * (1 + SNAPSHOT_SIZE)
+DOUBLE_SIZE = 8
+
+class SnapshotBuffer:
+    """Двойной буфер снимков состояния со seqlock на каждом слоте.
+
+    Писатель всегда пишет в неактивный слот и затем переключает номер
+    последнего слота; читатель копирует последний слот и повторяет
+    чтение, если за это время слот успели переписать.
+    """
+
+    def __init__(self, name=None, shared=True):
+        self.memory = None
+        if shared:
+            if name is None:
+                self.memory = shared_memory.SharedMemory(create=True, size=BUFFER_SIZE * DOUBLE_SIZE)
+                self.owner = True
+            else:
+                self.memory = shared_memory.SharedMemory(name=name)
+                self.owner = False
+            self.values = self.memory.buf.cast('d')
+        else:
+            self.owner = False
+            self.values = memoryview(bytearray(BUFFER_SIZE * DOUBLE_SIZE)).cast('d')
+        self.name = self.memory.name if self.memory else None
+
+    def slot_base(self, slot):
+        return 1 + slot * (1 + SNAPSHOT_SIZE)
+
+    def write(self, snapshot):
+        values = self.values
+        slot = 1 - int(values[0])
+        base = self.slot_base(slot)
+
+        values[base] += 1  # нечетный счетчик - слот пишется
+        values[base + 1:base + 1 + SNAPSHOT_SIZE] = snapshot
+        values[base] += 1  # четный - слот готов
+        values[0] = slot
+
+    def read(self):
+        """Копия последнего целого снимка или None, если его пока нет"""
+        values = self.values
+        for _ in range(8):
+            base = self.slot_base(int(values[0]))
+            sequence = values[base]
+            if sequence == 0 or int(sequence) % 2:
+                continue
+            snapshot = values[base + 1:base + 1 + SNAPSHOT_SIZE].tolist()
+            if values[base] == sequence:
+                return snapshot
+        return None
+
+    def close(self):
+        self.values.release()
+        if self.memory:
+            self.memory.close()
+            if self.owner:
+                self.memory.unlink()
+
+def encode_snapshot(game_manager, snapshot, animation_names):
+    """Пишет состояние матча в плоский массив чисел"""
+    snapshot[0] = time.perf_counter()
+    snapshot[1] = game_manager.time_ms
+    snapshot[2], snapshot[3] = game_manager.camera_offset
+    snapshot[4], snapshot[5] = game_manager.previous_camera_offset
+    for i, name in enumerate(SOUND_NAMES):
+        snapshot[6 + i] = game_manager.sound_counts.get(name, 0)
+
+    index = HEADER_SIZE
+    for player in game_manager.players:
+        hitbox = player.attack_hitbox
+        values = [player.position.x, player.position.y,
+                  player.previous_position.x, player.previous_position.y,
+                  player.health, 1.0 if player.facing_right else 0.0,
+                  animation_names.index(player.current_animation), player.animation_frame]
+        values += [1.0 if player.actions[flag] else 0.0 for flag in PLAYER_FLAGS]
+        values += [1.0 if player.attack_active else 0.0, hitbox.x, hitbox.y, hitbox.width, hitbox.height]
+        snapshot[index:index + PLAYER_SIZE] = array('d', values)
+        index += PLAYER_SIZE
+
+def apply_snapshot(game_manager, snapshot, animation_names):
+    """Переносит снимок на игроков GameManager, который только рисует"""
+    game_manager.time_ms = snapshot[1]
+    game_manager.camera_offset[:] = snapshot[2:4]
+    game_manager.previous_camera_offset[:] = snapshot[4:6]
+
+    index = HEADER_SIZE
+    for player in game_manager.players:
+        values = snapshot[index:index + PLAYER_SIZE]
+        player.position.update(values[0], values[1])
+        player.previous_position.update(values[2], values[3])
+        player.rect.x = values[0]
+        player.rect.y = values[1]
+        player.health = values[4]
+        player.facing_right = values[5] > 0.5
+        player.current_animation = animation_names[int(values[6])]
+        player.animation_frame = values[7]
+        for i, flag in enumerate(PLAYER_FLAGS):
+            player.actions[flag] = values[8 + i] > 0.5
+        flags_end = 8 + len(PLAYER_FLAGS)
+        player.attack_active = values[flags_end] > 0.5
+        player.attack_hitbox.update(*values[flags_end + 1:flags_end + 5])
+        index += PLAYER_SIZE
+
+def simulation_main(buffer_name, commands, stop, assets_path, tick_rate, in_process):
+    """Цикл симуляции: фиксированный шаг, команды ввода, публикация снимков"""
+    if in_process:
+        init_headless()
+    import pygame
+    from game_manager import GameManager
+
+    # Размер поверхности при render_scale=1.0 задает размер мира
+    game_manager = GameManager(pygame.Surface((1000, 600)), assets_path,
+                               audio=False, local_input=False, level_number=None)
+    players = game_manager.players
+    animation_names = list(players[0].animation_folders)
+    buffer = buffer_name if isinstance(buffer_name, SnapshotBuffer) else SnapshotBuffer(buffer_name)
+    snapshot = array('d', bytes(SNAPSHOT_SIZE * DOUBLE_SIZE))
+
+    tick_time = 1.0 / tick_rate
+    next_tick = time.perf_counter()
+    try:
+        while not stop.is_set():
+            # Ввод, пришедший от отрисовки
+            while True:
+                try:
+                    command = commands.get_nowait()
+                except queue.Empty:
+                    break
+                kind, player_index, first, second = command
+                player = players[player_index]
+                if kind == 'action':
+                    player.handle_action(first, second)
+                elif kind == 'move':
+                    player.input_left, player.input_right = first, second
+
+            game_manager.update()
+            encode_snapshot(game_manager, snapshot, animation_names)
+            buffer.write(snapshot)
+
+            next_tick += tick_time
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -5 * tick_time:
+                # Сильно отстали - не догоняем, а начинаем отсчет заново
+                next_tick = time.perf_counter()
+    finally:
+        game_manager.close()
+        if not isinstance(buffer_name, SnapshotBuffer):
+            buffer.close()
+
+class RemoteControls:
+    """Заместитель игрока для InputRouter: пересылает ввод в поток/процесс симуляции"""
+
+    def __init__(self, index, controls, commands):
+        self.index = index
+        self.controls = controls
+        self.commands = commands
+        self.input_left = False
+        self.input_right = False
+        self.sent_movement = (False, False)
+
+    def handle_action(self, action, pressed):
+        self.commands.put(('action', self.index, action, pressed))
+
+    def flush_movement(self):
+        movement = (bool(self.input_left), bool(self.input_right))
+        if movement != self.sent_movement:
+            self.sent_movement = movement
+            self.commands.put(('move', self.index, movement[0], movement[1]))
+
+class SimulationWorker:
+    """Симуляция в отдельном потоке ('thread') или процессе ('process')"""
+
+    def __init__(self, mode, assets_path, tick_rate=60):
+        self.mode = mode
+        self.tick_rate = tick_rate
+        in_process = mode == 'process'
+
+        if in_process:
+            context = multiprocessing.get_context('spawn')
+            self.buffer = SnapshotBuffer()
+            self.commands = context.Queue()
+            self.stop_event = context.Event()
+            self.worker = context.Process(
+                target=simulation_main, name='simulation', daemon=True,
+                args=(self.buffer.name, self.commands, self.stop_event, assets_path, tick_rate, True))
+        else:
+            self.buffer = SnapshotBuffer(shared=False)
+            self.commands = queue.Queue()
+            self.stop_event = threading.Event()
+            self.worker = threading.Thread(
+                target=simulation_main, name='simulation', daemon=True,
+                args=(self.buffer, self.commands, self.stop_event, assets_path, tick_rate, False))
+
+    def start(self):
+        self.worker.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.worker.join(timeout=5)
+        self.buffer.close()
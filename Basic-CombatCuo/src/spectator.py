@@ -0,0 +1,399 @@
+import os
+import sys
+import json
+import time
+import socket
+import struct
+import selectors
+import threading
+from array import array
+from collections import deque
+
+from sim_split import SNAPSHOT_SIZE, SOUND_NAMES, encode_snapshot, apply_snapshot
+
+# 2: номер тика и time_ms - целыми полями перед снимком
+PROTOCOL_VERSION = 2
+# Кадр: длина (4 байта) + тип + данные
+FRAME_HEADER = struct.Struct('<Ic')
+# Начало кадра состояния: номер тика и время симуляции в мс. В float32
+# они теряют точность (time_ms - уже через ~4.6 часа), поэтому идут целыми;
+# остальной снимок - float32 начиная с третьего значения
+STATE_HEADER = struct.Struct('<Iq')
+HELLO = b'H'
+STATE = b'S'
+
+def make_frame(kind, payload):
+    return FRAME_HEADER.pack(len(payload) + 1, kind) + payload
+
+class SpectatorConnection:
+    """Зритель на стороне сервера: сокет и очередь еще не отправленных кадров"""
+
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.pending = deque()
+        # Сколько байт первого кадра очереди уже ушло
+        self.offset = 0
+        self.writing = False
+
+class SpectatorServer:
+    """Трансляция матча зрителям по TCP.
+
+    Состояние кодируется один раз за тик (publish из игрового потока), и
+    один и тот же кадр раздается всем зрителям из сетевого потока. Зритель,
+    у которого скопилось больше max_pending неотправленных кадров,
+    отключается, чтобы не тормозить остальных и не копить память.
+    """
+
+    def __init__(self, game_manager, host='127.0.0.1', port=0, max_clients=512,
+                 max_pending=30, send_buffer=16 * 1024):
+        self.game_manager = game_manager
+        self.max_clients = max_clients
+        self.max_pending = max_pending
+        # Маленький буфер ядра: иначе отстающий зритель долго копит кадры в ядре,
+        # а не в нашей очереди, и его отставание не видно
+        self.send_buffer = send_buffer
+        self.animation_names = list(game_manager.players[0].animation_folders)
+        self.snapshot = array('d', bytes(SNAPSHOT_SIZE * 8))
+        self.tick = 0
+
+        # Приветствие: все, что зрителю нужно, чтобы построить ту же арену
+        self.hello = make_frame(HELLO, json.dumps({
+            'version': PROTOCOL_VERSION,
+            'arena_seed': game_manager.arena_seed,
+            'arena_size': list(game_manager.arena_size),
+            'animations': self.animation_names,
+        }).encode('utf-8'))
+
+        self.listener = socket.create_server((host, port), backlog=128)
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+        # Будильник сетевого потока: игровой поток пишет байт после publish
+        self.wake_reader, self.wake_writer = socket.socketpair()
+        self.wake_reader.setblocking(False)
+        self.wake_writer.setblocking(False)
+
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.selector.register(self.wake_reader, selectors.EVENT_READ)
+        self.clients = {}
+        # Закодированные, но еще не разосланные кадры (игровой поток -> сетевой)
+        self.frames = deque()
+
+        self.frames_sent = 0
+        self.dropped_clients = 0
+        self.running = True
+        self.thread = threading.Thread(target=self.network_loop, name='spectator', daemon=True)
+        self.thread.start()
+
+    def publish(self):
+        """Кодирует текущее состояние матча; вызывается раз за тик"""
+        encode_snapshot(self.game_manager, self.snapshot, self.animation_names)
+        # Время публикации зрителю не нужно - вместо него номер тика
+        payload = (STATE_HEADER.pack(self.tick, round(self.game_manager.time_ms)) +
+                   array('f', self.snapshot[2:]).tobytes())
+        self.tick += 1
+        self.frames.append(make_frame(STATE, payload))
+        try:
+            self.wake_writer.send(b'\0')
+        except BlockingIOError:
+            pass  # сетевой поток и так уже разбужен
+
+    def network_loop(self):
+        while self.running:
+            for key, events in self.selector.select(timeout=0.5):
+                sock = key.fileobj
+                if sock is self.listener:
+                    self.accept()
+                elif sock is self.wake_reader:
+                    self.drain_wake()
+                    self.fan_out()
+                else:
+                    client = key.data
+                    if events & selectors.EVENT_READ:
+                        self.read(client)
+                    if events & selectors.EVENT_WRITE and client.sock in self.clients:
+                        self.flush(client)
+
+    def accept(self):
+        while True:
+            try:
+                sock, address = self.listener.accept()
+            except BlockingIOError:
+                return
+            if len(self.clients) >= self.max_clients:
+                sock.close()
+                continue
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+            client = SpectatorConnection(sock, address)
+            client.pending.append(self.hello)
+            self.clients[sock] = client
+            self.selector.register(sock, selectors.EVENT_READ, client)
+            self.flush(client)
+
+    def drain_wake(self):
+        try:
+            while self.wake_reader.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def fan_out(self):
+        """Раздает новые кадры: один и тот же объект bytes в очередь каждого зрителя"""
+        while self.frames:
+            frame = self.frames.popleft()
+            for client in list(self.clients.values()):
+                if len(client.pending) >= self.max_pending:
+                    self.drop(client)
+                    continue
+                client.pending.append(frame)
+                self.flush(client)
+
+    def flush(self, client):
+        pending = client.pending
+        while pending:
+            data = pending[0]
+            try:
+                sent = client.sock.send(memoryview(data)[client.offset:])
+            except BlockingIOError:
+                break
+            except OSError:
+                self.drop(client, slow=False)
+                return
+            client.offset += sent
+            if client.offset < len(data):
+                break
+            pending.popleft()
+            client.offset = 0
+            self.frames_sent += 1
+
+        # Ждем готовности к записи, только пока есть хвост
+        writing = bool(pending)
+        if writing != client.writing:
+            client.writing = writing
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+            self.selector.modify(client.sock, events, client)
+
+    def read(self, client):
+        """Зрители ничего не присылают - пустое чтение значит отключение"""
+        try:
+            data = client.sock.recv(4096)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b''
+        if not data:
+            self.drop(client, slow=False)
+
+    def drop(self, client, slow=True):
+        if self.clients.pop(client.sock, None) is None:
+            return
+        if slow:
+            self.dropped_clients += 1
+        self.selector.unregister(client.sock)
+        client.sock.close()
+        client.pending.clear()
+
+    def client_count(self):
+        return len(self.clients)
+
+    def close(self):
+        self.running = False
+        try:
+            self.wake_writer.send(b'\0')
+        except OSError:
+            pass
+        self.thread.join()
+        for client in list(self.clients.values()):
+            self.drop(client, slow=False)
+        self.selector.close()
+        for sock in (self.listener, self.wake_reader, self.wake_writer):
+            sock.close()
+
+class SpectatorClient:
+    """Получатель трансляции: разбирает поток кадров, хранит последний снимок"""
+
+    def __init__(self, host, port, timeout=5.0):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setblocking(False)
+        self.buffer = bytearray()
+        self.hello = None
+        self.latest = None
+        self.received_time = 0.0
+        self.frames_received = 0
+        self.connected = True
+
+    def poll(self):
+        """Читает все, что пришло; возвращает True, если появился новый снимок"""
+        while True:
+            try:
+                data = self.sock.recv(65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                data = b''
+            if not data:
+                self.connected = False
+                break
+            self.buffer += data
+
+        updated = False
+        buffer = self.buffer
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            length, kind = FRAME_HEADER.unpack_from(buffer, offset)
+            end = offset + 4 + length
+            if end > len(buffer):
+                break
+            payload = buffer[offset + FRAME_HEADER.size:end]
+            if kind == HELLO:
+                self.hello = json.loads(payload.decode('utf-8'))
+            elif kind == STATE:
+                # Промежуточные снимки не нужны - берем последний
+                tick, time_ms = STATE_HEADER.unpack_from(payload)
+                self.latest = [tick, time_ms] + array('f', bytes(payload[STATE_HEADER.size:])).tolist()
+                self.frames_received += 1
+                updated = True
+            offset = end
+        del buffer[:offset]
+
+        if updated:
+            self.received_time = time.perf_counter()
+        return updated
+
+    def wait_hello(self, timeout=5.0):
+        deadline = time.perf_counter() + timeout
+        while self.hello is None and self.connected and time.perf_counter() < deadline:
+            self.poll()
+            time.sleep(0.01)
+        return self.hello
+
+    def close(self):
+        self.sock.close()
+
+def run_viewer(host, port, assets_path, tick_rate=60):
+    """Окно зрителя: рисует транслируемый матч теми же ассетами, что и игра"""
+    import pygame
+    from game_manager import GameManager
+    from telemetry import Telemetry
+
+    client = SpectatorClient(host, port)
+    hello = client.wait_hello()
+    if hello is None or hello['version'] != PROTOCOL_VERSION:
+        print("Сервер трансляции не ответил или несовместим")
+        return
+
+    pygame.init()
+    screen = pygame.display.set_mode((1000, 600))
+    pygame.display.set_caption(f"2D Fighter - зритель {host}:{port}")
+    clock = pygame.time.Clock()
+    view = GameManager(screen, assets_path, match_log=Telemetry(None),
+                       arena_seed=hello['arena_seed'], arena_size=tuple(hello['arena_size']),
+                       local_input=False)
+    animation_names = hello['animations']
+    tick_time = 1.0 / tick_rate
+    sound_counts = None
+
+    running = True
+    while running and client.connected:
+        clock.tick(tick_rate * 2)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_i:
+                view.handle_event(event)
+
+        client.poll()
+        snapshot = client.latest
+        if snapshot is None:
+            continue
+        apply_snapshot(view, snapshot, animation_names)
+
+        # Звуки по счетчикам; то, что прозвучало до подключения, не играем
+        counts = [int(value) for value in snapshot[6:6 + len(SOUND_NAMES)]]
+        if sound_counts is not None:
+            for name, count, previous in zip(SOUND_NAMES, counts, sound_counts):
+                if count > previous:
+                    view.play_sound(name)
+        sound_counts = counts
+
+        alpha = min(1.0, (time.perf_counter() - client.received_time) / tick_time)
+        view.draw(alpha)
+        pygame.display.flip()
+
+    client.close()
+    view.close()
+    pygame.quit()
+
+# Пять часов симуляции
+LONG_MATCH_MS = 5 * 3600 * 1000.0 + 0.4
+
+def loopback_check(num_clients=200, ticks=600):
+    """Безголовая проверка по loopback: сотни зрителей плюс один, который не читает"""
+    from headless import init_headless, get_default_assets_path
+    init_headless()
+    import pygame
+    from game_manager import GameManager
+    from telemetry import Telemetry
+
+    print("=== ТРАНСЛЯЦИЯ ЗРИТЕЛЯМ ===")
+    game_manager = GameManager(pygame.Surface((1000, 600)), get_default_assets_path(),
+                               match_log=Telemetry(None), audio=False, local_input=False,
+                               level_number=None)
+    server = SpectatorServer(game_manager, max_pending=30)
+    host, port = server.address[:2]
+
+    clients = [SpectatorClient(host, port) for _ in range(num_clients)]
+    # Медленный зритель: маленький буфер приема и ни одного чтения
+    slow = socket.socket()
+    slow.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024)
+    slow.connect((host, port))
+    for client in clients:
+        client.wait_hello()
+
+    game_manager.players[0].input_right = True
+    # Долгий матч: время, которое float32 уже не держит с точностью до мс
+    game_manager.time_ms = LONG_MATCH_MS
+    publish_time = 0.0
+    for _ in range(ticks):
+        game_manager.update()
+        start = time.perf_counter()
+        server.publish()
+        publish_time += time.perf_counter() - start
+        for client in clients:
+            client.poll()
+        time.sleep(0.002)
+
+    time.sleep(0.2)
+    for client in clients:
+        client.poll()
+
+    received = [client.frames_received for client in clients]
+    last_tick = min(int(client.latest[0]) for client in clients)
+    exact_time = all(client.latest[1] == round(game_manager.time_ms) for client in clients)
+    print(f"Зрителей: {num_clients}, тиков: {ticks}")
+    print(f"publish на тик: {publish_time / ticks * 1e6:.0f} мкс")
+    print(f"Кадров получено: мин {min(received)}, макс {max(received)}, последний тик {last_tick}")
+    print(f"Отключено медленных: {server.dropped_clients}, осталось зрителей: {server.client_count()}")
+    print(f"time_ms у зрителей: {'точно' if exact_time else 'с потерей точности'}")
+
+    ok = last_tick == ticks - 1 and server.dropped_clients == 1 and exact_time
+    print(f"Результат: {'OK' if ok else 'ОШИБКА'}")
+    print("===========================")
+
+    slow.close()
+    for client in clients:
+        client.close()
+    server.close()
+    game_manager.close()
+    return ok
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    if len(sys.argv) >= 3:
+        from headless import get_default_assets_path
+        run_viewer(sys.argv[1], int(sys.argv[2]), get_default_assets_path())
+    else:
+        loopback_check()
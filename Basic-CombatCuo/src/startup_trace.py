@@ -0,0 +1,164 @@
+import os
+import sys
+import json
+import time
+import builtins
+import statistics
+import subprocess
+from contextlib import contextmanager
+
+# Бюджет времени до первого кадра для безголового замера (мс)
+TIME_TO_FIRST_FRAME_BUDGET_MS = 1500
+
+class StartupTrace:
+    """Трассировка запуска: именованные фазы, время импортов и время до первого кадра.
+
+    Выключена по умолчанию - тогда span() ничего не замеряет. Включается
+    переменной окружения FIGHTER_STARTUP_TRACE=1 или флагом --trace.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        # (имя, начало, конец, глубина вложенности)
+        self.spans = []
+        # (модуль, длительность вместе с вложенными импортами, глубина)
+        self.imports = []
+        self.depth = 0
+        self.import_depth = 0
+        self.first_frame_time = None
+        self.original_import = None
+
+    def start(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.origin = time.perf_counter()
+        self.original_import = builtins.__import__
+        builtins.__import__ = self.traced_import
+
+    def traced_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        # Меряем только первый импорт модуля - повторный берется из sys.modules
+        if level or name in sys.modules:
+            return self.original_import(name, globals, locals, fromlist, level)
+
+        start = time.perf_counter()
+        depth = self.import_depth
+        self.import_depth += 1
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            self.import_depth -= 1
+            self.imports.append((name, time.perf_counter() - start, depth))
+
+    @contextmanager
+    def span(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        depth = self.depth
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            self.spans.append((name, start, time.perf_counter(), depth))
+
+    def first_frame(self):
+        """Отмечает показ первого кадра и снимает перехват импортов"""
+        if not self.enabled or self.first_frame_time is not None:
+            return
+        self.first_frame_time = time.perf_counter()
+        builtins.__import__ = self.original_import
+
+    def time_to_first_frame(self):
+        return ((self.first_frame_time or time.perf_counter()) - self.origin) * 1000.0
+
+    def to_dict(self):
+        return {
+            'time_to_first_frame_ms': self.time_to_first_frame(),
+            'spans': [(name, (start - self.origin) * 1000.0, (end - start) * 1000.0, depth)
+                      for name, start, end, depth in sorted(self.spans, key=lambda s: (s[1], s[3]))],
+            'imports': [(name, duration * 1000.0, depth) for name, duration, depth in self.imports],
+        }
+
+    def report(self, top_imports=10):
+        data = self.to_dict()
+        total = data['time_to_first_frame_ms']
+        lines = [f"=== ЗАПУСК: ДО ПЕРВОГО КАДРА {total:.1f} мс ==="]
+        for name, offset, duration, depth in data['spans']:
+            share = duration / total * 100.0 if total else 0.0
+            lines.append(f"{offset:8.1f} мс  {'  ' * depth}{name:<{36 - 2 * depth}} "
+                         f"{duration:8.1f} мс {share:5.1f}%")
+
+        # Импорты верхнего уровня - их сумма и есть время импорта
+        imports = sorted((item for item in data['imports'] if item[2] == 0),
+                         key=lambda item: item[1], reverse=True)
+        lines.append(f"Импорты: {sum(item[1] for item in imports):.1f} мс, самые долгие:")
+        for name, duration, _ in imports[:top_imports]:
+            lines.append(f"  {name:<34} {duration:8.1f} мс")
+        lines.append("=" * 40)
+        return '\n'.join(lines)
+
+# Общий трассировщик процесса
+trace = StartupTrace()
+
+def enable_from_environment():
+    if os.environ.get('FIGHTER_STARTUP_TRACE') == '1' or '--trace' in sys.argv:
+        trace.start()
+
+# Запускается в отдельном процессе, чтобы импорты и кэши ОС были как при настоящем запуске
+FIRST_FRAME_SCRIPT = '''
+import os, sys, json
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, {src!r})
+import startup_trace
+startup_trace.trace.start()
+with startup_trace.trace.span('import main'):
+    import main
+
+game = main.Game(DEFERRED_INIT={deferred!r})
+game.handle_events()
+game.render(0.0)
+game.present()
+print(json.dumps(startup_trace.trace.to_dict()))
+game.game_manager.close()
+'''
+
+def measure_first_frame(deferred):
+    src = os.path.dirname(os.path.abspath(__file__))
+    script = FIRST_FRAME_SCRIPT.format(src=src, deferred=deferred)
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                            text=True, check=True, cwd=os.path.dirname(src)).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def benchmark_startup(runs=3):
+    """Безголовый замер времени до первого кадра: обычный и отложенный запуск"""
+    print("=== ВРЕМЯ ДО ПЕРВОГО КАДРА ===")
+    ok = True
+    for deferred in (False, True):
+        results = [measure_first_frame(deferred) for _ in range(runs)]
+        times = [result['time_to_first_frame_ms'] for result in results]
+        median = statistics.median(times)
+        ok &= median <= TIME_TO_FIRST_FRAME_BUDGET_MS
+
+        # Фазы верхнего уровня - медиана по запускам
+        phases = {}
+        for result in results:
+            for name, _, duration, depth in result['spans']:
+                if depth <= 1:
+                    phases.setdefault((depth, name), []).append(duration)
+        mode = "отложенная инициализация" if deferred else "обычный запуск"
+        print(f"{mode}: медиана {median:.1f} мс (запуски: {', '.join(f'{t:.0f}' for t in times)})")
+        for (depth, name), durations in phases.items():
+            print(f"  {'  ' * depth}{name:<34} {statistics.median(durations):8.1f} мс")
+
+    print(f"Бюджет {TIME_TO_FIRST_FRAME_BUDGET_MS} мс: {'OK' if ok else 'ПРЕВЫШЕН'}")
+    print("==============================")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark_startup() else 1)
@@ -0,0 +1,125 @@
+import os
+import sys
+import json
+import time
+import threading
+
+# Типы событий и имена их полей (поля идут в записи по порядку)
+HIT = 'hit'
+BLOCK = 'block'
+KNOCKBACK = 'knockback'
+DEATH = 'death'
+RESPAWN = 'respawn'
+JUMP = 'jump'
+FRAME_OVERRUN = 'frame_overrun'
+ANIMATION_LOADED = 'animation_loaded'
+TOGGLE = 'toggle'
+ERROR = 'error'
+INPUT_LATENCY = 'input_latency'
+
+EVENT_FIELDS = {
+    HIT: ('attacker', 'defender', 'damage', 'heavy'),
+    BLOCK: ('attacker', 'defender', 'damage'),
+    KNOCKBACK: ('player', 'force'),
+    DEATH: ('player',),
+    RESPAWN: ('player', 'phase'),
+    JUMP: ('player',),
+    FRAME_OVERRUN: ('frame_ms',),
+    ANIMATION_LOADED: ('player', 'animation', 'frames'),
+    TOGGLE: ('name', 'value'),
+    ERROR: ('source', 'message'),
+    INPUT_LATENCY: ('pacing', 'samples', 'p50_ms', 'p90_ms', 'p99_ms'),
+}
+
+class Telemetry:
+    """Структурированный журнал матча: кольцевой буфер + фоновая запись в JSONL.
+
+    Игровой поток только кладет кортеж в буфер; форматирование и запись на
+    диск делает отдельный поток пачками. Буфер рассчитан на одного писателя
+    и одного читателя, поэтому обходится без блокировок.
+    """
+
+    def __init__(self, path=None, capacity=8192, flush_interval=0.5):
+        self.path = path
+        self.enabled = path is not None
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+
+        self.slots = [None] * capacity
+        self.write_index = 0
+        self.read_index = 0
+        self.dropped = 0
+
+        self.start_time = time.perf_counter()
+        self.running = False
+        self.wake = threading.Event()
+        self.writer = None
+
+        if self.enabled:
+            self.start()
+
+    def start(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.running = True
+        self.writer = threading.Thread(target=self.writer_loop, name='telemetry', daemon=True)
+        self.writer.start()
+
+    def record(self, event_type, *values):
+        """Кладет событие в буфер; при переполнении событие отбрасывается"""
+        if not self.enabled:
+            return
+
+        write_index = self.write_index
+        if write_index - self.read_index >= self.capacity:
+            self.dropped += 1
+            return
+
+        elapsed_ms = (time.perf_counter() - self.start_time) * 1000.0
+        self.slots[write_index % self.capacity] = (event_type, elapsed_ms, values)
+        self.write_index = write_index + 1
+
+    def drain(self):
+        """Забирает накопленные события (вызывается только потоком записи)"""
+        batch = []
+        read_index = self.read_index
+        write_index = self.write_index
+        while read_index < write_index:
+            slot = read_index % self.capacity
+            batch.append(self.slots[slot])
+            self.slots[slot] = None
+            read_index += 1
+        self.read_index = read_index
+        return batch
+
+    def writer_loop(self):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            while self.running:
+                self.wake.wait(self.flush_interval)
+                self.wake.clear()
+                self.write_batch(f, self.drain())
+            self.write_batch(f, self.drain())
+
+    def write_batch(self, f, batch):
+        if not batch:
+            return
+
+        lines = []
+        for event_type, elapsed_ms, values in batch:
+            record = {'t': round(elapsed_ms, 2), 'type': event_type}
+            record.update(zip(EVENT_FIELDS[event_type], values))
+            lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+
+            # Ошибки дублируем в stderr, но уже из фонового потока
+            if event_type == ERROR:
+                print(f"Ошибка {values[0]}: {values[1]}", file=sys.stderr)
+
+        f.write('\n'.join(lines) + '\n')
+        f.flush()
+
+    def close(self):
+        """Останавливает поток записи, дописав все оставшиеся события"""
+        if not self.running:
+            return
+        self.running = False
+        self.wake.set()
+        self.writer.join()
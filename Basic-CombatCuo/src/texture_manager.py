@@ -0,0 +1,130 @@
+import pygame
+from collections import OrderedDict
+
+def surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+class TextureManager:
+    """Учет памяти анимаций с вытеснением давно не использованных (LRU) сверх бюджета"""
+
+    def __init__(self, budget_bytes=64 * 1024 * 1024):
+        self.budget_bytes = budget_bytes
+        # (тип сущности, анимация, размер кадра) -> [кадры, байты, закреплено]
+        self.entries = OrderedDict()
+        # (тип сущности, анимация) -> [(маска, отраженная маска)] по кадрам.
+        # Маски - данные симуляции: всегда в мировом размере, от разрешения
+        # отрисовки не зависят и не вытесняются вместе с кадрами
+        self.masks = {}
+        self.mask_bytes = 0
+        self.total_bytes = 0
+        self.evictions = 0
+        self.reloads = 0
+        # Ключи, которые уже выгружались - повторная загрузка считается перезагрузкой
+        self.evicted_keys = set()
+
+    def get(self, key, loader):
+        """Кадры анимации; при промахе загружает их через loader"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry[0]
+
+        frames = loader()
+        if key in self.evicted_keys:
+            self.reloads += 1
+        self.add(key, frames, pinned=False)
+        return frames
+
+    def build_masks(self, key, loader):
+        """Маски столкновений кадров (обычная, отраженная) по альфе - один раз на ключ.
+
+        loader возвращает кадры в мировом размере (не вариант для отрисовки).
+        """
+        masks = self.masks.get(key)
+        if masks is None:
+            masks = []
+            for frame in loader():
+                masks.append((pygame.mask.from_surface(frame),
+                              pygame.mask.from_surface(pygame.transform.flip(frame, True, False))))
+                width, height = frame.get_size()
+                self.mask_bytes += 2 * (width * height // 8)
+            self.masks[key] = masks
+        return masks
+
+    def track(self, key, frames):
+        """Учитывает кадры, которые держит сам владелец (их нельзя вытеснить)"""
+        self.add(key, frames, pinned=True)
+
+    def add(self, key, frames, pinned):
+        size = sum(surface_bytes(frame) for frame in frames)
+        self.entries[key] = [frames, size, pinned]
+        self.total_bytes += size
+        self.evict(keep=key)
+
+    def remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[1]
+
+    def evict(self, keep=None):
+        """Выгружает самые давние анимации, пока не уложимся в бюджет"""
+        for key in list(self.entries):
+            if self.total_bytes <= self.budget_bytes:
+                return
+            entry = self.entries[key]
+            if key == keep or entry[2]:
+                continue
+            del self.entries[key]
+            self.total_bytes -= entry[1]
+            self.evictions += 1
+            self.evicted_keys.add(key)
+
+    def usage_by_entity(self):
+        """Байты по типам сущностей"""
+        usage = {}
+        for (entity_type, _, _), entry in self.entries.items():
+            usage[entity_type] = usage.get(entity_type, 0) + entry[1]
+        return usage
+
+    def usage_by_animation(self, entity_type):
+        """Байты по анимациям одного типа сущности"""
+        return {key[1]: entry[1] for key, entry in self.entries.items() if key[0] == entity_type}
+
+class AnimationSet:
+    """Словарь анимаций сущности, который берет кадры из TextureManager по требованию.
+
+    Кадры не хранятся внутри - выгруженная анимация прозрачно загрузится
+    заново при следующем обращении, а одинаковые анимации разных
+    сущностей одного типа хранятся один раз.
+    """
+
+    def __init__(self, texture_manager, entity_type, frame_size, names, loader, mask_loader=None):
+        self.texture_manager = texture_manager
+        self.names = names
+        self.loader = loader
+        # mask_loader(name) - кадры в мировом размере для масок попаданий
+        self.mask_loader = mask_loader
+        # Ключи и загрузчики собираются заранее, чтобы обращение в тике ничего не создавало
+        self.keys = {name: (entity_type, name, frame_size) for name in names}
+        self.loaders = {name: self.make_loader(loader, name) for name in names}
+        self.mask_keys = {name: (entity_type, name) for name in names}
+
+    def make_loader(self, loader, name):
+        return lambda: loader(name)
+
+    def __getitem__(self, name):
+        return self.texture_manager.get(self.keys[name], self.loaders[name])
+
+    def masks(self, name):
+        """Готовые маски анимации; строятся в preload, в тике только чтение"""
+        return self.texture_manager.masks[self.mask_keys[name]]
+
+    def __contains__(self, name):
+        return name in self.keys
+
+    def preload(self):
+        for name in self.names:
+            self[name]
+            if self.mask_loader:
+                self.texture_manager.build_masks(self.mask_keys[name],
+                                                 self.make_loader(self.mask_loader, name))